@@ -4,7 +4,7 @@ Tracks compliance status of member banks, merchants, and vendors.
 Monitors certifications, identifies at-risk entities, and triggers alerts.
 """
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 
 
 # Certification data for entities (extends mock_data)
@@ -75,9 +75,11 @@ RISK_WEIGHTS = {
 class EcosystemTracker:
     """Track compliance status of ecosystem entities"""
 
-    def __init__(self):
+    def __init__(self, anomaly_source: Optional[Callable[[str], bool]] = None):
         self.notification_thresholds = NOTIFICATION_THRESHOLDS
         self.risk_weights = RISK_WEIGHTS
+        # entity_id -> whether transaction monitoring has flagged it (Agent 3)
+        self.anomaly_source = anomaly_source
 
     def get_entity_certifications(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -160,10 +162,11 @@ class EcosystemTracker:
         return expiring
 
     def calculate_entity_risk(self, entity_id: str, violation_count: int = 0, 
-                               has_anomalies: bool = False) -> Dict[str, Any]:
+                               has_anomalies: Optional[bool] = None) -> Dict[str, Any]:
         """
         Calculate comprehensive risk score for an entity
         Risk score is 0-100, calculated from multiple factors
+        has_anomalies defaults to what the anomaly source reports
         """
         cert_data = ENTITY_CERTIFICATIONS.get(entity_id)
         if not cert_data:
@@ -212,6 +215,8 @@ class EcosystemTracker:
             top_concerns.append(f"{violation_count} critical violation count")
 
         # 3. TRANSACTION ANOMALY FACTOR (0-20 points)
+        if has_anomalies is None:
+            has_anomalies = self.anomaly_source is not None and self.anomaly_source(entity_id)
         if has_anomalies:
             factors["anomalies"] = 20
             top_concerns.append("Transaction anomalies detected")
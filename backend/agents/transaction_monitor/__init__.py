@@ -0,0 +1,34 @@
+"""
+Agent 3: Transaction Monitor
+PAN detection and anomaly flagging for transaction and settlement logs
+"""
+from .anomaly import VolumeSpikeDetector
+from .bin_table import BinTable
+from .card_testing import CardTestingDetector
+from .dedup import FindingDeduplicator
+from .detectors import Detector, DetectorRegistry
+from .drift import DistributionDriftDetector
+from .follow import LogFollower
+from .monitor import TransactionMonitor, demo_scan
+from .records import PanViolation, PiiViolation
+from .rules import DetectionRule, RulesEngine
+from .scanner import PanScanner
+from .suppression import SuppressionList
+from .tokenizer import PanTokenizer
+from .velocity import CardVelocityEngine
+
+__all__ = [
+    "TransactionMonitor", "PanScanner", "PanTokenizer", "PanViolation", "PiiViolation",
+    "BinTable", "Detector", "DetectorRegistry", "FindingDeduplicator", "LogFollower",
+    "VolumeSpikeDetector", "CardTestingDetector", "CardVelocityEngine",
+    "DistributionDriftDetector", "DetectionRule", "RulesEngine",
+    "SuppressionList", "BatchScanJob", "demo_scan",
+]
+
+
+def __getattr__(name: str):
+    # batch is loaded on first use, so `python -m agents.transaction_monitor.batch` runs it only once
+    if name == "BatchScanJob":
+        from .batch import BatchScanJob
+        return BatchScanJob
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
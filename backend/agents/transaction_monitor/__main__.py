@@ -0,0 +1,6 @@
+"""Agent 3 scanner CLI: python -m agents.transaction_monitor --help"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Agent 3: Transaction Monitor - streaming volume anomalies
+Per-merchant decayed transaction rates against a long-run baseline
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from .records import iso_timestamp
+from .sketches import lru_lookup
+
+# Decay time constants (seconds): the "current" rate and the baseline
+SHORT_WINDOW = 3600
+BASELINE_WINDOW = 30 * 24 * 3600
+
+# Current/baseline ratio that raises an alert, and twice that for critical
+SPIKE_THRESHOLD = 3.0
+
+# Decayed events in the short window before a merchant can alert
+MIN_EVENTS = 50
+
+# History a merchant needs before its baseline is trusted (seconds)
+MIN_HISTORY = 24 * 3600
+
+# Quiet time after an alert before the same merchant alerts again (seconds)
+ALERT_COOLDOWN = 3600
+
+# Merchants tracked at once; the longest idle are dropped past this
+MAX_MERCHANTS = 100_000
+
+
+class MerchantVolume:
+    """
+    Rolling volume state of one merchant - a fixed handful of floats
+    `short` and `baseline` are exponentially decayed event counts: each
+    event multiplies them by exp(-dt / window) and adds one, so count /
+    window is the recent event rate. O(1) per event, nothing per event kept.
+    """
+    __slots__ = ("first_seen", "last_seen", "short", "baseline", "last_alert")
+
+    def __init__(self, timestamp: float):
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.short = 0.0
+        self.baseline = 0.0
+        self.last_alert = None
+
+    def rates(self, short_window: float, baseline_window: float) -> Tuple[float, float]:
+        """(current, baseline) events per hour, corrected for short histories"""
+        age = self.last_seen - self.first_seen
+        return (
+            self.short / short_window / _coverage(age, short_window) * 3600,
+            self.baseline / baseline_window / _coverage(age, baseline_window) * 3600,
+        )
+
+
+class VolumeSpikeDetector:
+    """
+    Streaming per-merchant volume-spike detector
+    Feed (merchant_id, timestamp) events in roughly time order. A
+    merchant alerts when its current hourly rate is SPIKE_THRESHOLD times
+    its baseline, once it has MIN_HISTORY of history and MIN_EVENTS
+    recent events, at most once per cooldown. Memory is one
+    MerchantVolume per merchant, capped at max_merchants.
+    """
+
+    def __init__(self, short_window: float = SHORT_WINDOW, baseline_window: float = BASELINE_WINDOW,
+                 threshold: float = SPIKE_THRESHOLD, min_events: float = MIN_EVENTS,
+                 min_history: float = MIN_HISTORY, cooldown: float = ALERT_COOLDOWN,
+                 max_merchants: int = MAX_MERCHANTS):
+        self.short_window = short_window
+        self.baseline_window = baseline_window
+        self.threshold = threshold
+        self.min_events = min_events
+        self.min_history = min_history
+        self.cooldown = cooldown
+        self.max_merchants = max_merchants
+        # Capped LRU table - see lru_lookup
+        self.merchants: "OrderedDict[str, MerchantVolume]" = OrderedDict()
+        self.events = 0
+
+    def observe(self, merchant_id: str, timestamp: Optional[float] = None) -> Optional[dict]:
+        """Count one transaction; returns an alert dict when it tips the merchant into a spike"""
+        return self._observe(merchant_id, time.time() if timestamp is None else timestamp)
+
+    def observe_many(self, events: Iterable[Tuple[str, float]]) -> List[dict]:
+        """Count a batch of (merchant_id, timestamp) events; returns the alerts raised"""
+        alerts = []
+        observe = self._observe
+        for merchant_id, timestamp in events:
+            alert = observe(merchant_id, timestamp)
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def _observe(self, merchant_id: str, timestamp: float) -> Optional[dict]:
+        self.events += 1
+        state = lru_lookup(self.merchants, merchant_id, self.max_merchants)
+        if state is None:
+            state = self.merchants[merchant_id] = MerchantVolume(timestamp)
+
+        elapsed = timestamp - state.last_seen
+        if elapsed > 0:
+            state.short *= math.exp(-elapsed / self.short_window)
+            state.baseline *= math.exp(-elapsed / self.baseline_window)
+            state.last_seen = timestamp
+        state.short += 1.0
+        state.baseline += 1.0
+
+        if state.short < self.min_events or timestamp - state.first_seen < self.min_history:
+            return None
+        if state.last_alert is not None and timestamp - state.last_alert < self.cooldown:
+            return None
+        current, baseline = state.rates(self.short_window, self.baseline_window)
+        if current < self.threshold * baseline:
+            return None
+        state.last_alert = timestamp
+        return self._alert(merchant_id, timestamp, current, baseline)
+
+    def _alert(self, merchant_id: str, timestamp: float, current: float, baseline: float) -> dict:
+        deviation = current / baseline
+        return {
+            "type": "volume_spike",
+            "severity": "critical" if deviation >= 2 * self.threshold else "high",
+            "entity_id": merchant_id,
+            "current_rate_per_hour": round(current),
+            "baseline_rate_per_hour": round(baseline),
+            "deviation": round(deviation, 1),
+            "detected_at": iso_timestamp(timestamp),
+            "description": f"Volume {deviation:.1f}x the baseline for {merchant_id}",
+        }
+
+    def snapshot(self, merchant_id: str) -> Optional[dict]:
+        """Current and baseline hourly rates of one merchant, or None if unseen"""
+        state = self.merchants.get(merchant_id)
+        if state is None:
+            return None
+        current, baseline = state.rates(self.short_window, self.baseline_window)
+        return {
+            "entity_id": merchant_id,
+            "current_rate_per_hour": round(current, 1),
+            "baseline_rate_per_hour": round(baseline, 1),
+            "deviation": round(current / baseline, 2) if baseline else None,
+        }
+
+
+def _coverage(age: float, window: float) -> float:
+    """Share of a decayed count's weight covered by `age` seconds of history (1 with none yet)"""
+    return 1.0 - math.exp(-age / window) if age > 0 else 1.0
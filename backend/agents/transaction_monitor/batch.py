@@ -0,0 +1,408 @@
+"""
+Agent 3: Transaction Monitor - batch scan jobs
+Scans every file matching a set of globs in a process pool, reporting per file as JSON lines
+"""
+import argparse
+import glob
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import BinaryIO, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import parallel
+from .compression import DECOMPRESSION_ERRORS, detect_compression, open_log_stream
+from .parallel import SHARD_SIZE, _scan_shard, merge_shards, plan_shards
+from .records import PanViolation, to_dicts
+from .scanner import new_scan_stats
+
+# Files below this size are scanned several to a task (1 MiB)
+SMALL_FILE = 1 << 20
+
+# Most bytes of small files grouped into one task (8 MiB)
+BATCH_BYTES = 8 << 20
+
+# Tasks in flight per worker - bounds memory however many files match
+QUEUE_PER_WORKER = 2
+
+# How often the job looks for file reports while tasks run (seconds)
+REPORT_POLL = 0.1
+
+# Exit statuses of the batch and scanner CLIs
+EXIT_CLEAN, EXIT_VIOLATIONS, EXIT_ERRORS = 0, 1, 2
+
+# Per-process queue grouped tasks send each file's report back on
+_worker_reports = None
+
+
+class LineCounter(io.RawIOBase):
+    """Raw reader that counts the newlines passing through it"""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.lines = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.lines += data.count(b"\n")
+        return size
+
+
+def scan_source(monitor, source: BinaryIO, name: str,
+                masked: Optional[BinaryIO] = None) -> Tuple[List[PanViolation], dict]:
+    """
+    Scan one input stream, decompressing it on the fly
+    With `masked`, a copy with every PAN masked is written there in the
+    same pass. Stats gain `lines`, for compressed input the codec and
+    compressed size, and with suppressions set what was `suppressed` -
+    counted here, so the totals add up the same in worker processes.
+    """
+    stats = new_scan_stats()
+    suppressions = monitor.suppressions
+    before = dict(suppressions.counts) if suppressions is not None else None
+    readable, compression, raw_counter = open_log_stream(source)
+    counter = LineCounter(readable)
+    started = time.perf_counter()
+    if masked is not None:
+        violations = monitor.redact_stream(io.BufferedReader(counter), masked, source_name=name, stats=stats)
+    else:
+        violations = list(monitor.scan_stream(io.BufferedReader(counter), source=name, stats=stats))
+    stats["seconds"] = round(time.perf_counter() - started, 6)
+    stats["lines"] = counter.lines
+    if compression:
+        stats["compression"] = compression
+        stats["bytes_compressed"] = raw_counter.bytes_read
+    if suppressions is not None:
+        stats["suppressed"] = suppressions.counted_since(before)
+    return violations, stats
+
+
+def iter_paths(patterns: Iterable[str], skip: Optional[Set[str]] = None) -> Iterator[str]:
+    """
+    Files matching the globs (** included), each once, lazily
+    A plain path is passed on even if it is missing, so it is reported
+    as an error rather than silently dropped.
+    """
+    seen = set(skip or ())
+    for pattern in patterns:
+        magic = glob.has_magic(pattern)
+        for path in glob.iglob(pattern, recursive=True) if magic else [pattern]:
+            path = os.path.abspath(path)
+            if path not in seen and (os.path.isfile(path) or not magic):
+                seen.add(path)
+                yield path
+
+
+def plan_tasks(paths: Iterable[str], small_file: int = SMALL_FILE, batch_bytes: int = BATCH_BYTES,
+               shard_size: int = SHARD_SIZE, masked: Optional[Dict[str, str]] = None) -> Iterator[tuple]:
+    """
+    Turn files into pool tasks
+    ("files", [(path, size, whole, masked_path), ...]) groups small files
+    up to batch_bytes; ("shard", path, start, end, count) is one of
+    `count` line-aligned pieces of a large plain file. Compressed files,
+    and files with a masked copy to write, are streamed whole (`whole`),
+    one to a task. ("error", path, message) is a file that cannot be read.
+    """
+    masked = masked or {}
+    batch, batch_size = [], 0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+            with open(path, "rb") as log_file:
+                whole = detect_compression(log_file.read(8)) is not None or path in masked
+        except OSError as error:
+            yield ("error", path, str(error))
+            continue
+        if size > shard_size and not whole:
+            shards = plan_shards(path, shard_size)
+            for start, end in shards:
+                yield ("shard", path, start, end, len(shards))
+        elif size >= small_file or whole:
+            yield ("files", [(path, size, whole, masked.get(path))])
+        else:
+            batch.append((path, size, False, None))
+            batch_size += size
+            if batch_size >= batch_bytes:
+                yield ("files", batch)
+                batch, batch_size = [], 0
+    if batch:
+        yield ("files", batch)
+
+
+def _init_batch_worker(monitor, reports) -> None:
+    """Pool initializer - the worker monitor, and the queue file reports go back on"""
+    global _worker_reports
+    parallel._init_worker(monitor)
+    _worker_reports = reports
+
+
+def _scan_files(files: List[Tuple[str, int, bool, Optional[str]]]) -> int:
+    """
+    Scan a group of whole files in a worker, sending each file's report
+    back as soon as it is done - so the group's finished files are
+    reported even if the job dies mid-group; returns how many were sent
+    """
+    for path, size, whole, masked_path in files:
+        started = time.perf_counter()
+        try:
+            violations, stats = _scan_one(path, size, whole, masked_path)
+        except DECOMPRESSION_ERRORS as error:
+            _worker_reports.put(_file_report(path, [], started, error=repr(error)))
+            continue
+        _worker_reports.put(_file_report(path, violations, started, stats))
+    return len(files)
+
+
+def _scan_one(path: str, size: int, whole: bool, masked_path: Optional[str]) -> Tuple[List[PanViolation], dict]:
+    """One file's violations and stats; a small plain file is read in one go"""
+    if not whole:
+        return merge_shards([_scan_shard((path, 0, size))])
+    with open(path, "rb") as source:
+        if masked_path is None:
+            return scan_source(parallel._worker_monitor, source, path)
+        with open(masked_path, "wb") as masked:
+            return scan_source(parallel._worker_monitor, source, path, masked)
+
+
+def _file_report(path: str, violations: list, started: float,
+                 stats: Optional[dict] = None, error: Optional[str] = None) -> dict:
+    """
+    One file's JSON-lines record; `bytes` is what was scanned (decompressed),
+    with `bytes_compressed` the size read from disk for archives
+    """
+    stats = stats or {}
+    report = {
+        "type": "file",
+        "path": path,
+        "bytes": stats.get("bytes_total", 0),
+        "lines": stats.get("lines", 0),
+        "violations_found": len(violations),
+        "status": "error" if error else "critical" if violations else "clean",
+        "seconds": round(time.perf_counter() - started, 6),
+        "violations": to_dicts(violations),
+        "prefilter": {"bytes_skipped": stats.get("bytes_skipped", 0),
+                      "candidate_windows": stats.get("candidate_windows", 0)},
+    }
+    if stats.get("compression"):
+        report["compression"] = stats["compression"]
+        report["bytes_compressed"] = stats["bytes_compressed"]
+    if "suppressed" in stats:
+        report["suppressed"] = stats["suppressed"]
+    if error:
+        report["error"] = error
+    return report
+
+
+class BatchScanJob:
+    """
+    Scan a landing directory's worth of files on a process pool
+    Files are found lazily and fed through a bounded queue - at most
+    workers * QUEUE_PER_WORKER tasks are in flight - so memory stays flat
+    for any number of matches. Small files share a task but report one
+    by one as each finishes; large ones are split at newlines and their
+    shards merged back with global line numbers. Reports are yielded as
+    files complete, followed by one summary. With `skip`, files already
+    reported by an earlier run are left out, so a crash loses at most the
+    file each worker was on (for a split file, its shards so far).
+    `masked` maps input paths to where their masked copies go.
+    """
+
+    def __init__(self, monitor, patterns: Iterable[str], workers: Optional[int] = None,
+                 small_file: int = SMALL_FILE, batch_bytes: int = BATCH_BYTES,
+                 shard_size: int = SHARD_SIZE, skip: Optional[Set[str]] = None,
+                 masked: Optional[Dict[str, str]] = None):
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+        self.monitor = monitor
+        self.patterns = list(patterns)
+        self.workers = workers or os.cpu_count() or 1
+        self.small_file = small_file
+        self.batch_bytes = batch_bytes
+        self.shard_size = shard_size
+        self.skip = skip or set()
+        self.masked = masked or {}
+        self.summary = {"type": "summary", "files": 0, "files_with_violations": 0, "violations_found": 0,
+                        "errors": 0, "bytes": 0, "bytes_compressed": 0, "lines": 0, "skipped": len(self.skip)}
+        self._reports = None
+        # path -> the grouped task it belongs to, for files not yet reported
+        self._unreported: Dict[str, object] = {}
+
+    def run(self) -> Iterator[dict]:
+        """Yield a report per file as it completes, then the summary"""
+        started = time.perf_counter()
+        tasks = plan_tasks(iter_paths(self.patterns, self.skip), self.small_file, self.batch_bytes,
+                           self.shard_size, self.masked)
+        # path -> {"started", "parts": {shard start: _scan_shard result}, "error"} for files in pieces
+        shards: Dict[str, dict] = {}
+        pending = {}
+        limit = self.workers * QUEUE_PER_WORKER
+        self._reports = multiprocessing.Queue()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_batch_worker,
+                                 initargs=(self.monitor, self._reports)) as executor:
+            for task in tasks:
+                if task[0] == "error":
+                    yield self._count(_file_report(task[1], [], time.perf_counter(), error=task[2]))
+                    continue
+                while len(pending) >= limit:
+                    yield from self._collect(pending, shards)
+                if task[0] == "files":
+                    future = executor.submit(_scan_files, task[1])
+                    for path, *_ in task[1]:
+                        self._unreported[path] = future
+                else:
+                    future = executor.submit(_scan_shard, task[1:4])
+                pending[future] = (task, time.perf_counter())
+            while pending:
+                yield from self._collect(pending, shards)
+        self._reports.close()
+
+        seconds = time.perf_counter() - started
+        self.summary["seconds"] = round(seconds, 3)
+        self.summary["mb_per_s"] = round(self.summary["bytes"] / 1e6 / seconds, 1) if seconds > 0 else 0.0
+        yield self.summary
+
+    def _collect(self, pending: dict, shards: Dict[str, dict]) -> Iterator[dict]:
+        """Wait a little for tasks, yielding the file reports that came in and the files tasks completed"""
+        done, _ = wait(pending, timeout=REPORT_POLL, return_when=FIRST_COMPLETED)
+        yield from self._received(block=False)
+        for future in done:
+            task, submitted = pending.pop(future)
+            if task[0] == "files":
+                yield from self._finish_group(future, task, submitted)
+                continue
+
+            _, path, start, end, count = task
+            pieces = shards.setdefault(path, {"started": submitted, "parts": {}, "error": None})
+            try:
+                pieces["parts"][start] = future.result()
+            except Exception as error:
+                pieces["parts"][start] = ([], 0, {})
+                pieces["error"] = repr(error)
+            if len(pieces["parts"]) == count:
+                del shards[path]
+                parts = pieces["parts"]
+                violations, stats = merge_shards(parts[start] for start in sorted(parts))
+                yield self._count(_file_report(path, violations, pieces["started"], stats,
+                                               error=pieces["error"]))
+
+    def _finish_group(self, future, task: tuple, submitted: float) -> Iterator[dict]:
+        """A grouped task is done - wait for the reports still on their way, or fail what never came"""
+        try:
+            future.result()
+        except Exception as error:
+            for path, *_ in task[1]:
+                if self._unreported.pop(path, None) is not None:
+                    yield self._count(_file_report(path, [], submitted, error=repr(error)))
+            return
+        while any(path in self._unreported for path, *_ in task[1]):
+            yield from self._received(block=True)
+
+    def _received(self, block: bool) -> Iterator[dict]:
+        """File reports sent back by grouped tasks - one (waited for) if `block`, else all already in"""
+        while True:
+            try:
+                report = self._reports.get(block=block)
+            except queue.Empty:
+                return
+            if self._unreported.pop(report["path"], None) is not None:
+                yield self._count(report)
+            if block:
+                return
+
+    def _count(self, report: dict) -> dict:
+        summary = self.summary
+        summary["files"] += 1
+        summary["bytes"] += report["bytes"]
+        summary["bytes_compressed"] += report.get("bytes_compressed", 0)
+        summary["lines"] += report["lines"]
+        summary["violations_found"] += report["violations_found"]
+        summary["files_with_violations"] += bool(report["violations_found"])
+        summary["errors"] += report["status"] == "error"
+        return report
+
+
+def completed_paths(report_path: str) -> Set[str]:
+    """Files an earlier run already reported, read back from its JSON lines"""
+    done = set()
+    try:
+        with open(report_path) as report_file:
+            for line in report_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by the crash
+                if record.get("type") == "file" and record.get("status") != "error":
+                    done.add(record["path"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def write_reports(reports: Iterable[dict], output: IO) -> dict:
+    """Write reports as JSON lines, flushed one by one; returns the last (the summary)"""
+    record = {}
+    for record in reports:
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+    return record
+
+
+def exit_status(errors: int, violations: int) -> int:
+    """EXIT_ERRORS when any input failed, else EXIT_VIOLATIONS when PANs were found"""
+    if errors:
+        return EXIT_ERRORS
+    return EXIT_VIOLATIONS if violations else EXIT_CLEAN
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as report_file:
+        report_file.seek(-1, os.SEEK_END)
+        return report_file.read(1) == b"\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m agents.transaction_monitor.batch '/data/settlements/**/*.log*' -o report.jsonl"""
+    parser = argparse.ArgumentParser(description="Scan files matching globs for PANs, one JSON line per file",
+                                     epilog="Exit status is 2 when any file could not be scanned, "
+                                            "else 1 when any violation was found, else 0.")
+    parser.add_argument("patterns", nargs="+", help="files or globs - quote them so ** reaches the scanner")
+    parser.add_argument("-o", "--output", help="JSON-lines report file (default stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--resume", action="store_true", help="skip files already reported in --output")
+    parser.add_argument("--shard-mb", type=int, default=SHARD_SIZE >> 20, help="split plain files larger than this")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.shard_mb <= 0:
+        parser.error("--shard-mb must be positive")
+
+    from .monitor import TransactionMonitor
+
+    skip = completed_paths(args.output) if args.resume else set()
+    job = BatchScanJob(TransactionMonitor(), args.patterns, workers=args.workers,
+                       shard_size=args.shard_mb << 20, skip=skip)
+    if args.output:
+        with open(args.output, "a" if args.resume else "w") as output:
+            if output.tell() and not _ends_with_newline(args.output):
+                output.write("\n")  # close a line cut short by the crash
+            summary = write_reports(job.run(), output)
+    else:
+        summary = write_reports(job.run(), sys.stdout)
+    print(f"{summary['files']:,} files, {summary['bytes'] / 1e6:,.1f} MB in {summary['seconds']}s "
+          f"({summary['mb_per_s']} MB/s) - {summary['violations_found']:,} violations in "
+          f"{summary['files_with_violations']:,} files, {summary['errors']} errors", file=sys.stderr)
+    return exit_status(summary["errors"], summary["violations_found"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
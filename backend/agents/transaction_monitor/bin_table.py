@@ -0,0 +1,151 @@
+"""
+Agent 3: Transaction Monitor - BIN/IIN range table
+Sorted, non-overlapping range arrays for O(log n) brand and issuer lookups
+"""
+import csv
+import heapq
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Ranges are compared on this many leading digits (8-digit BINs)
+BIN_DIGITS = 8
+
+# (low prefix, high prefix, brand, issuer country, product type); prefixes
+# may be any length up to BIN_DIGITS - "4" covers 40000000-49999999
+BinRange = Tuple[str, str, str, Optional[str], Optional[str]]
+
+# Brand-level ranges matching the original prefix rules, plus a few demo
+# issuer ranges for the test cards used across the dashboard
+DEFAULT_BIN_RANGES: List[BinRange] = [
+    ("4", "4", "Visa", None, None),
+    ("51", "55", "Mastercard", None, None),
+    ("2221", "2720", "Mastercard", None, None),
+    ("34", "34", "American Express", None, None),
+    ("37", "37", "American Express", None, None),
+    ("6011", "6011", "Discover", None, None),
+    ("644", "649", "Discover", None, None),
+    ("65", "65", "Discover", None, None),
+    # Demo issuer ranges
+    ("453201", "453299", "Visa", "US", "credit"),
+    ("411111", "411111", "Visa", "US", "credit"),
+    ("542523", "542523", "Mastercard", "US", "credit"),
+    ("378282", "378282", "American Express", "US", "charge"),
+    ("601111", "601111", "Discover", "US", "credit"),
+]
+
+
+def bin_key(digits: str) -> int:
+    """Integer key of a card number's leading BIN_DIGITS digits"""
+    return int(digits[:BIN_DIGITS].ljust(BIN_DIGITS, "0"))
+
+
+class BinTable:
+    """
+    Brand, issuer country and product type by card number prefix
+    Ranges live in three flat uint32 arrays (start, end, record index)
+    sorted by start, so a lookup is one bisect - no per-range objects, which
+    keeps millions of ranges in a few tens of MB. Where ranges overlap the
+    narrowest one wins, so issuer ranges refine brand-level ones.
+    """
+
+    def __init__(self, ranges: Iterable[BinRange] = ()):
+        self.starts = array("I")
+        self.ends = array("I")
+        self.record_ids = array("I")
+        # Distinct (brand, country, product type) tuples, shared by ranges
+        self.records: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self._build(ranges)
+
+    @classmethod
+    def default(cls) -> "BinTable":
+        """Table built from DEFAULT_BIN_RANGES"""
+        return cls(DEFAULT_BIN_RANGES)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "BinTable":
+        """
+        Load ranges from a CSV file with a header row
+        Columns: low, high, brand, country, product_type (the last two may
+        be empty). `low` and `high` are digit prefixes.
+        """
+        with open(path, newline="") as bin_file:
+            rows = csv.DictReader(bin_file)
+            return cls(
+                (row["low"], row["high"], row["brand"],
+                 row.get("country") or None, row.get("product_type") or None)
+                for row in rows
+            )
+
+    def _build(self, ranges: Iterable[BinRange]) -> None:
+        """Flatten possibly overlapping ranges into sorted disjoint ones"""
+        record_index: Dict[Tuple, int] = {}
+        intervals = []
+        for low, high, brand, country, product_type in ranges:
+            record = (brand, country, product_type)
+            if record not in record_index:
+                record_index[record] = len(self.records)
+                self.records.append(record)
+            start = int(low.ljust(BIN_DIGITS, "0"))
+            end = int(high.ljust(BIN_DIGITS, "9"))
+            if start <= end:
+                intervals.append((start, end, record_index[record]))
+        intervals.sort()
+
+        # Disjoint input (the usual BIN file) needs no flattening
+        if all(intervals[i][1] < intervals[i + 1][0] for i in range(len(intervals) - 1)):
+            self.starts.extend(start for start, _, _ in intervals)
+            self.ends.extend(end for _, end, _ in intervals)
+            self.record_ids.extend(record_id for _, _, record_id in intervals)
+            return
+
+        # Sweep range boundaries; the active range with the smallest width
+        # owns each elementary interval
+        active: List[Tuple[int, int, int]] = []  # (width, end, record id)
+        position = 0
+        next_range = 0
+        while next_range < len(intervals) or active:
+            while active and active[0][1] < position:
+                heapq.heappop(active)
+            if not active:
+                if next_range == len(intervals):
+                    break
+                position = max(position, intervals[next_range][0])
+            while next_range < len(intervals) and intervals[next_range][0] <= position:
+                start, end, record_id = intervals[next_range]
+                heapq.heappush(active, (end - start, end, record_id))
+                next_range += 1
+            while active and active[0][1] < position:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            _, end, record_id = active[0]
+            # The owner holds until it ends or a new range starts
+            if next_range < len(intervals):
+                end = min(end, intervals[next_range][0] - 1)
+            self._append(position, end, record_id)
+            position = end + 1
+
+    def _append(self, start: int, end: int, record_id: int) -> None:
+        """Add a disjoint range, merging it into the previous one if adjacent"""
+        if self.ends and self.ends[-1] + 1 == start and self.record_ids[-1] == record_id:
+            self.ends[-1] = end
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.record_ids.append(record_id)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup_key(self, key: int) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """(brand, country, product type) for a bin_key, or None"""
+        index = bisect_right(self.starts, key) - 1
+        if index >= 0 and key <= self.ends[index]:
+            return self.records[self.record_ids[index]]
+        return None
+
+    def lookup(self, digits: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """(brand, country, product type) for a card number's digits, or None"""
+        return self.lookup_key(bin_key(digits))
@@ -0,0 +1,214 @@
+"""
+Agent 3: Transaction Monitor - card-testing detection
+Per-merchant distinct cards, countries and decline rate from fixed-size sketches
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from .records import iso_timestamp
+from .sketches import CountMinSketch, HyperLogLog, lru_lookup
+
+# Length of the window a merchant's card and decline stats cover (seconds)
+WINDOW = 3600
+
+# Attempts in the window before a merchant is scored
+MIN_ATTEMPTS = 20
+
+# Attempts seen from a merchant before countries can count as new
+MIN_COUNTRY_HISTORY = 100
+
+# A country with less than this share of a merchant's past attempts is new
+NEW_COUNTRY_SHARE = 0.01
+
+# Score that raises a card-testing alert
+ALERT_SCORE = 0.7
+
+# Decline rate assumed until a merchant has a baseline
+TYPICAL_DECLINE_RATE = 0.06
+
+# Windows of at least MIN_ATTEMPTS folded into the decline baseline before
+# it replaces TYPICAL_DECLINE_RATE - averaged evenly until then
+MIN_BASELINE_WINDOWS = 3
+
+# Weight of each new window in the decline baseline after that (exponential average)
+BASELINE_WEIGHT = 0.1
+
+# Weights of the score components (sum to 1)
+SCORE_WEIGHTS = {"decline_excess": 0.5, "new_country_share": 0.3, "country_spread": 0.2}
+
+# Merchants tracked at once; the longest idle are dropped past this
+MAX_MERCHANTS = 20_000
+
+# ISO 8583 response code for an approval
+APPROVED = "00"
+
+
+class MerchantCardStats:
+    """
+    One merchant's current window - a HyperLogLog of cards (1 KiB),
+    attempts per country, attempt and decline counts and new-country hits -
+    plus what carries over between windows: a HyperLogLog of every country
+    seen (64 bytes) and the decline-rate baseline. Windows that raised an
+    alert are left out of the baseline, so an attack does not become the
+    merchant's normal.
+    """
+    __slots__ = ("window_start", "last_seen", "cards", "countries", "window_countries", "attempts",
+                 "declines", "new_country", "history", "baseline_decline", "baseline_windows", "alerted", "score")
+
+    def __init__(self, timestamp: float):
+        self.window_start = timestamp
+        self.last_seen = timestamp
+        self.cards = HyperLogLog(10)
+        self.countries = HyperLogLog(6)
+        # Attempts per country this window - at most one entry per country
+        self.window_countries: Dict[str, int] = {}
+        self.attempts = 0
+        self.declines = 0
+        self.new_country = 0
+        # Attempts ever seen - gates new-country counting
+        self.history = 0
+        self.baseline_decline = None
+        self.baseline_windows = 0
+        self.alerted = False
+        self.score = None  # cached until the next event
+
+    def roll(self, timestamp: float, window: float) -> None:
+        """Start a new window, folding the old decline rate into the baseline"""
+        if self.attempts >= MIN_ATTEMPTS and not self.alerted:
+            rate = self.declines / self.attempts
+            self.baseline_windows += 1
+            weight = max(1 / self.baseline_windows, BASELINE_WEIGHT)
+            self.baseline_decline = rate if self.baseline_decline is None \
+                else (1 - weight) * self.baseline_decline + weight * rate
+        self.window_start = timestamp - (timestamp - self.window_start) % window
+        self.cards.clear()
+        self.window_countries = {}
+        self.attempts = self.declines = self.new_country = 0
+        self.alerted = False
+
+
+class CardTestingDetector:
+    """
+    Streaming card-testing signals per merchant in bounded memory
+    Distinct cards per window and countries all time come from
+    HyperLogLogs, and all-time per-(merchant, country) and per-(merchant,
+    response code) tallies from shared Count-Min sketches, so memory does
+    not grow with the cards or merchant-country pairs seen. Cards are only
+    ever hashed. The score combines the decline rate over the merchant's
+    baseline, the share of attempts from countries new to it and how many
+    countries the window spans; it is cached per merchant, so score()
+    costs a dict lookup.
+    """
+
+    def __init__(self, window: float = WINDOW, alert_score: float = ALERT_SCORE,
+                 max_merchants: int = MAX_MERCHANTS):
+        self.window = window
+        self.alert_score = alert_score
+        self.max_merchants = max_merchants
+        # Capped LRU table - see lru_lookup
+        self.merchants: "OrderedDict[str, MerchantCardStats]" = OrderedDict()
+        # (merchant, country) -> attempts and (merchant, response code) -> declines
+        self.country_counts = CountMinSketch()
+        self.decline_counts = CountMinSketch()
+        self.events = 0
+
+    def observe(self, merchant_id: str, card: str, country: Optional[str], response_code: str,
+                timestamp: Optional[float] = None) -> Optional[dict]:
+        """Count one authorization attempt; returns an alert dict when the merchant's score crosses the threshold"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.events += 1
+        stats = lru_lookup(self.merchants, merchant_id, self.max_merchants)
+        if stats is None:
+            stats = self.merchants[merchant_id] = MerchantCardStats(timestamp)
+        elif timestamp - stats.window_start >= self.window:
+            stats.roll(timestamp, self.window)
+        stats.last_seen = timestamp
+        stats.score = None
+
+        stats.attempts += 1
+        stats.history += 1
+        stats.cards.add(card)
+        if country:
+            stats.countries.add(country)
+            # Attempts from this country before the current window
+            total = self.country_counts.add((merchant_id, country))
+            in_window = stats.window_countries[country] = stats.window_countries.get(country, 0) + 1
+            past = stats.history - stats.attempts
+            if past >= MIN_COUNTRY_HISTORY and total - in_window < NEW_COUNTRY_SHARE * past:
+                stats.new_country += 1
+        if response_code != APPROVED:
+            stats.declines += 1
+            self.decline_counts.add((merchant_id, response_code))
+
+        if stats.alerted or stats.attempts < MIN_ATTEMPTS or _score(stats) < self.alert_score:
+            return None
+        stats.alerted = True
+        report = self.score(merchant_id)
+        return {
+            "type": "card_testing",
+            "severity": "critical",
+            "entity_id": merchant_id,
+            **report,
+            "detected_at": iso_timestamp(timestamp),
+            "description": f"Pattern consistent with card testing at {merchant_id}",
+        }
+
+    def observe_many(self, events: Iterable[dict]) -> List[dict]:
+        """Count event dicts (merchant_id, card, country, response_code, timestamp); returns alerts"""
+        alerts = []
+        for event in events:
+            alert = self.observe(event["merchant_id"], event["card"], event.get("country"),
+                                 event.get("response_code", APPROVED), event.get("timestamp"))
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def score(self, merchant_id: str) -> Optional[dict]:
+        """Card-testing score (0-1) and its components for the merchant's current window"""
+        stats = self.merchants.get(merchant_id)
+        if stats is None:
+            return None
+        if stats.score is not None:
+            return stats.score
+
+        attempts = stats.attempts
+        stats.score = {
+            "score": round(_score(stats), 3),
+            "attempts": attempts,
+            "distinct_cards": round(stats.cards.count()),
+            "distinct_countries": len(stats.window_countries),
+            "distinct_countries_all_time": round(stats.countries.count()),
+            "decline_rate": round(stats.declines / attempts, 3) if attempts else 0.0,
+            "baseline_decline_rate": round(_baseline_decline(stats), 3),
+            "new_country_share": round(stats.new_country / attempts, 3) if attempts else 0.0,
+            "window_start": iso_timestamp(stats.window_start),
+        }
+        return stats.score
+
+    def decline_count(self, merchant_id: str, response_code: str) -> int:
+        """Declines with this response code at the merchant, all time (never undercounted)"""
+        return self.decline_counts.estimate((merchant_id, response_code))
+
+
+def _score(stats: MerchantCardStats) -> float:
+    """Weighted card-testing score of a merchant's current window, 0-1"""
+    attempts = stats.attempts
+    if attempts < MIN_ATTEMPTS:
+        return 0.0
+    decline_excess = (stats.declines / attempts - _baseline_decline(stats)) / 0.25
+    country_spread = (len(stats.window_countries) - 1) / 9
+    return (SCORE_WEIGHTS["decline_excess"] * _clamp(decline_excess)
+            + SCORE_WEIGHTS["new_country_share"] * stats.new_country / attempts
+            + SCORE_WEIGHTS["country_spread"] * _clamp(country_spread))
+
+
+def _baseline_decline(stats: MerchantCardStats) -> float:
+    """Decline rate of past windows, or a typical 6% until there are MIN_BASELINE_WINDOWS"""
+    if stats.baseline_windows < MIN_BASELINE_WINDOWS:
+        return TYPICAL_DECLINE_RATE
+    return stats.baseline_decline
+
+
+def _clamp(value: float) -> float:
+    return min(max(value, 0.0), 1.0)
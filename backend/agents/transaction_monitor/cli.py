@@ -0,0 +1,165 @@
+"""
+Agent 3: Transaction Monitor - command-line scanner
+Scans files or stdin for PANs, writing NDJSON violations and throughput stats
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import IO, Iterable, Iterator, List, Optional
+
+from .batch import BatchScanJob, _file_report, exit_status, scan_source
+from .compression import DECOMPRESSION_ERRORS
+from .monitor import TransactionMonitor, demo_scan
+from .parallel import SHARD_SIZE
+from .scanner import add_scan_stats
+from .suppression import SuppressionList
+
+# Name of stdin among the inputs
+STDIN = "-"
+
+
+def masked_path_for(path: str, masked: Optional[str], many: bool) -> Optional[str]:
+    """Where an input's masked copy goes - `masked` itself, or inside it for several inputs"""
+    if masked is None:
+        return None
+    if not many:
+        return masked
+    name = "stdin" if path == STDIN else os.path.basename(path)
+    # Masked copies are written uncompressed
+    for suffix in (".gz", ".bz2", ".xz"):
+        name = name[:-len(suffix)] if name.endswith(suffix) else name
+    return os.path.join(masked, name + ".masked")
+
+
+def unique_inputs(inputs: Iterable[str]) -> List[str]:
+    """Inputs with repeats of the same file dropped, first mention kept"""
+    seen, unique = set(), []
+    for path in inputs:
+        key = path if path == STDIN else os.path.realpath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def iter_reports(monitor: TransactionMonitor, inputs: List[str], workers: int = 1,
+                 masked: Optional[str] = None, shard_size: int = SHARD_SIZE) -> Iterator[dict]:
+    """
+    Yield a BatchScanJob file report per input, as each completes
+    An input named more than once is scanned once. Stdin is scanned in
+    this process first; files go through the batch job's bounded queue,
+    split into shards or grouped as it decides. An input that cannot be
+    read or decompressed gives a report with status "error", and the
+    rest are still scanned.
+    """
+    inputs = unique_inputs(inputs)
+    many = len(inputs) > 1
+    if masked is not None and many:
+        os.makedirs(masked, exist_ok=True)
+
+    if STDIN in inputs:
+        yield _scan_stdin(monitor, masked_path_for(STDIN, masked, many))
+    files = [path for path in inputs if path != STDIN]
+    if not files:
+        return
+    masked_paths = None
+    if masked is not None:
+        masked_paths = {os.path.abspath(path): masked_path_for(path, masked, many) for path in files}
+    # Inputs are literal paths, not globs
+    job = BatchScanJob(monitor, [glob.escape(path) for path in files], workers=workers, shard_size=shard_size, masked=masked_paths)
+    for report in job.run():
+        if report["type"] == "file":
+            yield report
+
+
+def _scan_stdin(monitor: TransactionMonitor, masked_path: Optional[str]) -> dict:
+    started = time.perf_counter()
+    try:
+        if masked_path is None:
+            violations, stats = scan_source(monitor, sys.stdin.buffer, "stdin")
+        else:
+            with open(masked_path, "wb") as masked_file:
+                violations, stats = scan_source(monitor, sys.stdin.buffer, "stdin", masked_file)
+    except DECOMPRESSION_ERRORS as error:
+        return _file_report("stdin", [], started, error=repr(error))
+    return _file_report("stdin", violations, started, stats)
+
+
+def summarize(reports: Iterable[dict], output: IO, seconds_started: float) -> dict:
+    """Write every input's violations (and an error record per failed input) and total up the stats"""
+    summary = {"type": "summary", "inputs": 0, "errors": 0, "bytes": 0, "bytes_compressed": 0, "lines": 0,
+               "hits": 0, "hits_by_card_type": {}, "candidate_windows": 0, "bytes_skipped": 0}
+    for report in reports:
+        summary["inputs"] += 1
+        if report["status"] == "error":
+            summary["errors"] += 1
+            output.write(json.dumps({"type": "error", "input": report["path"], "error": report["error"]}) + "\n")
+        for violation in report["violations"]:
+            output.write(json.dumps(violation) + "\n")
+            card_type = violation["card_type"]
+            summary["hits_by_card_type"][card_type] = summary["hits_by_card_type"].get(card_type, 0) + 1
+        summary["hits"] += report["violations_found"]
+        summary["bytes"] += report["bytes"]
+        summary["bytes_compressed"] += report.get("bytes_compressed", 0)
+        summary["lines"] += report["lines"]
+        summary["candidate_windows"] += report["prefilter"]["candidate_windows"]
+        summary["bytes_skipped"] += report["prefilter"]["bytes_skipped"]
+        if "suppressed" in report:
+            add_scan_stats(summary.setdefault("suppressed", {}), report["suppressed"])
+        output.flush()
+    seconds = time.perf_counter() - seconds_started
+    summary["seconds"] = round(seconds, 3)
+    summary["mb_per_s"] = round(summary["bytes"] / 1e6 / seconds, 1) if seconds > 0 else 0.0
+    summary["lines_per_s"] = round(summary["lines"] / seconds) if seconds > 0 else 0
+    summary["hits_per_mb"] = round(summary["hits"] / (summary["bytes"] / 1e6), 3) if summary["bytes"] else 0.0
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m agents.transaction_monitor [inputs...] - see --help"""
+    parser = argparse.ArgumentParser(
+        prog="python -m agents.transaction_monitor",
+        description="Scan logs for card numbers. Violations go out as NDJSON, throughput stats to stderr.",
+        epilog="Inputs may be plain, gzip, bz2 or xz; '-' (the default) reads stdin. Exit status is 2 "
+               "when any input could not be scanned, else 1 when any PAN was found, else 0.")
+    parser.add_argument("inputs", nargs="*", default=[STDIN], help="log files, or - for stdin")
+    parser.add_argument("-o", "--output", help="NDJSON violations file (default stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every core (default 1)")
+    parser.add_argument("-m", "--masked", help="write masked copies - a file for one input, "
+                                               "else a directory of <name>.masked files")
+    parser.add_argument("--stats", help="also write the stats JSON to this file")
+    parser.add_argument("--suppress-test-pans", action="store_true",
+                        help="leave out published card-network test numbers")
+    parser.add_argument("--shard-mb", type=int, default=SHARD_SIZE >> 20,
+                        help="shard size for splitting plain files across workers")
+    parser.add_argument("--demo", action="store_true", help="run the built-in three-line demo scan")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        demo_scan()
+        return 0
+    if args.shard_mb <= 0:
+        parser.error("--shard-mb must be positive")
+    if args.workers < 0:
+        parser.error("--workers cannot be negative")
+    workers = args.workers or os.cpu_count() or 1
+    monitor = TransactionMonitor(suppressions=SuppressionList() if args.suppress_test_pans else None)
+
+    started = time.perf_counter()
+    reports = iter_reports(monitor, args.inputs, workers=workers, masked=args.masked,
+                           shard_size=args.shard_mb << 20)
+    if args.output:
+        with open(args.output, "w") as output:
+            summary = summarize(reports, output, started)
+    else:
+        summary = summarize(reports, sys.stdout, started)
+
+    print(json.dumps(summary), file=sys.stderr)
+    if args.stats:
+        with open(args.stats, "w") as stats_file:
+            json.dump(summary, stats_file, indent=2)
+    return exit_status(summary["errors"], summary["hits"])
@@ -0,0 +1,75 @@
+"""
+Agent 3: Transaction Monitor - compressed log input
+Detects gzip/bz2/xz archives and decompresses them as a stream
+"""
+import bz2
+import gzip
+import io
+import lzma
+import zlib
+from typing import BinaryIO, Optional, Tuple
+
+# Leading magic bytes of each supported format
+COMPRESSION_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+
+# What a truncated or corrupt archive raises part-way through a read
+DECOMPRESSION_ERRORS = (EOFError, OSError, lzma.LZMAError, zlib.error)
+
+# Incremental decompressors - each reads the source in small blocks
+_OPENERS = {
+    "gzip": lambda source: gzip.GzipFile(fileobj=source, mode="rb"),
+    "bz2": lambda source: bz2.BZ2File(source, mode="rb"),
+    "xz": lambda source: lzma.LZMAFile(source, mode="rb"),
+}
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """Name the compression format from a file's first bytes, or None"""
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def is_compressed_file(path: str) -> bool:
+    """Whether a file on disk starts with a supported compression magic"""
+    with open(path, "rb") as log_file:
+        return detect_compression(log_file.read(8)) is not None
+
+
+class CountingReader(io.RawIOBase):
+    """Raw reader that counts the (compressed) bytes pulled through it"""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def open_log_stream(stream: BinaryIO) -> Tuple[BinaryIO, Optional[str], CountingReader]:
+    """
+    Wrap a binary stream so compressed input is decompressed on the fly
+    Returns (readable, compression, counter). Detection peeks at the first
+    bytes, so pipes and sockets work as well as files; `counter.bytes_read`
+    is the number of raw bytes consumed so far.
+    """
+    counter = CountingReader(stream)
+    buffered = io.BufferedReader(counter)
+    compression = detect_compression(buffered.peek(max(map(len, COMPRESSION_MAGIC.values()))))
+
+    if compression is None:
+        return buffered, None, counter
+    return _OPENERS[compression](buffered), compression, counter
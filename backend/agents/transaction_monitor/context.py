@@ -0,0 +1,146 @@
+"""
+Agent 3: Transaction Monitor - evidence context
+Captures masked lines around each hit from a bounded ring of recent lines
+"""
+from collections import deque
+from typing import Callable, Iterable, Iterator, List
+
+from .scanner import CHUNK_SIZE, LineTracker, Scannable
+
+# Longest context line kept in a snippet (characters, after masking)
+CONTEXT_LINE_LIMIT = 512
+
+
+class ContextSnippet:
+    """Masked lines around one hit - filled in as the scan reads on"""
+    __slots__ = ("first_line", "lines", "remaining")
+
+    def __init__(self, first_line: int, lines: list, remaining: int):
+        self.first_line = first_line
+        # Raw lines until complete, then masked and decoded str lines
+        self.lines = lines
+        # Lines still to come: the rest of the hit's line plus those after
+        self.remaining = remaining
+
+    @property
+    def done(self) -> bool:
+        return self.remaining == 0
+
+    def to_dict(self) -> dict:
+        return {"first_line": self.first_line, "lines": self.lines}
+
+
+class ContextTracker(LineTracker):
+    """
+    Line tracker that also keeps evidence context for every located hit
+    The last `before` complete lines sit in a ring buffer; a hit takes a
+    copy of them and then collects its own line and `after` more as the
+    scan moves on. Snippets are masked with `mask` once complete, so raw
+    PANs never leave the tracker. Memory is the ring plus open snippets,
+    whatever the input size - nothing is read twice.
+    """
+    __slots__ = ("after", "mask", "line_limit", "keep", "ring", "partial", "pending")
+
+    def __init__(self, before: int, after: int, mask: Callable[[Scannable], Scannable],
+                 max_span: int, line_limit: int = CONTEXT_LINE_LIMIT):
+        super().__init__()
+        self.after = after
+        self.mask = mask
+        self.line_limit = line_limit
+        # Raw characters kept per line: room past the limit so a PAN cut
+        # by the final truncation is still seen whole by the mask
+        self.keep = line_limit + max_span + 1
+        self.ring = deque(maxlen=before)
+        self.partial = None
+        self.pending: List[ContextSnippet] = []
+
+    def advance(self, buffer: Scannable, base: int, position: int) -> None:
+        """Feed the text up to `position` through the ring and open snippets"""
+        if position <= self.position:
+            return
+        end = position - base
+        for block_start in range(self.position - base, end, CHUNK_SIZE):
+            block = buffer[block_start:min(block_start + CHUNK_SIZE, end)]
+            if not isinstance(block, (str, bytes)):
+                block = bytes(block)
+            newline = "\n" if isinstance(block, str) else b"\n"
+            block_base = base + block_start
+
+            if not self.pending and self.ring.maxlen:
+                # Nothing waits for these lines - skip all but the ones the
+                # ring will still hold at the end of the block
+                skip = len(block)
+                for _ in range(self.ring.maxlen + 1):
+                    skip = block.rfind(newline, 0, skip)
+                    if skip < 0:
+                        break
+                if skip >= 0:
+                    self.line += block.count(newline, 0, skip + 1)
+                    self.partial = None
+                    block = block[skip + 1:]
+                    block_base += skip + 1
+
+            lines = block.split(newline)
+            head = lines[0] if self.partial is None else self.partial + lines[0]
+            if len(lines) == 1:
+                self.partial = head[:self.keep]
+                continue
+            self._complete([head] + lines[1:-1])
+            self.partial = lines[-1][:self.keep]
+            self.line += len(lines) - 1
+            self.line_start = block_base + len(block) - len(lines[-1])
+        self.position = position
+
+    def locate(self, buffer: Scannable, base: int, position: int) -> tuple:
+        """(line, column, snippet) - the snippet completes `after` lines later"""
+        line, column = super().locate(buffer, base, position)
+        snippet = ContextSnippet(line - len(self.ring), list(self.ring), self.after + 1)
+        self.pending.append(snippet)
+        return line, column, snippet
+
+    def close(self, buffer: Scannable, base: int, end: int) -> None:
+        """Feed the input's tail and finish every open snippet"""
+        while self.pending and self.position < end:
+            self.advance(buffer, base, min(self.position + CHUNK_SIZE, end))
+        if self.partial:
+            self._complete([self.partial])
+            self.partial = None
+        for snippet in self.pending:
+            self._finish(snippet)
+        self.pending = []
+
+    def _complete(self, lines: list) -> None:
+        """Hand newly completed lines to open snippets, then to the ring"""
+        if self.pending:
+            for snippet in self.pending:
+                snippet.lines.extend(line[:self.keep] for line in lines[:snippet.remaining])
+                snippet.remaining -= min(len(lines), snippet.remaining)
+                if snippet.done:
+                    self._finish(snippet)
+            self.pending = [snippet for snippet in self.pending if not snippet.done]
+        if self.ring.maxlen:
+            self.ring.extend(line[:self.keep] for line in lines[-self.ring.maxlen:])
+
+    def _finish(self, snippet: ContextSnippet) -> None:
+        """Mask and decode a snippet's lines"""
+        snippet.remaining = 0
+        if not snippet.lines:
+            return
+        newline = "\n" if isinstance(snippet.lines[0], str) else b"\n"
+        masked = self.mask(newline.join(snippet.lines))
+        if not isinstance(masked, str):
+            masked = masked.decode("utf-8", "replace")
+        snippet.lines = [line[:self.line_limit] for line in masked.split("\n")]
+
+
+def iter_completed(violations: Iterable) -> Iterator:
+    """
+    Yield violations once their context snippet is complete
+    Order is kept; a violation waits at most `after` lines of input.
+    """
+    waiting = deque()
+    for violation in violations:
+        waiting.append(violation)
+        while waiting and (waiting[0].context is None or waiting[0].context.done):
+            yield waiting.popleft()
+    yield from waiting
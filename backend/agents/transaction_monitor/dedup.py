@@ -0,0 +1,130 @@
+"""
+Agent 3: Transaction Monitor - finding deduplication
+Keyed-hash store of PANs already reported, so repeat sightings update one finding
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+# Findings not seen for this long are forgotten (seconds)
+DEDUP_TTL = 7 * 24 * 3600
+
+# Most findings kept - the least recently seen go first
+MAX_FINDINGS = 100_000
+
+# HMAC bytes kept per fingerprint
+FINGERPRINT_BYTES = 16
+
+# Random key shared by every store in this process when AEGIS_DEDUP_KEY is unset
+_PROCESS_KEY = secrets.token_bytes(32)
+
+
+def default_key() -> bytes:
+    """AEGIS_DEDUP_KEY, or one random key per process - fingerprints agree across stores either way"""
+    configured = os.getenv("AEGIS_DEDUP_KEY")
+    return configured.encode() if configured else _PROCESS_KEY
+
+
+def pan_fingerprint(key: bytes, digits: str) -> str:
+    """Keyed hash of a PAN's digits (hex)"""
+    return hmac.new(key, digits.encode(), hashlib.sha256).digest()[:FINGERPRINT_BYTES].hex()
+
+
+class Finding:
+    """One distinct PAN: when it was first and last seen and how often"""
+    __slots__ = ("fingerprint", "first_seen", "last_seen", "count", "alert_id")
+
+    def __init__(self, fingerprint: str, seen_at: float):
+        self.fingerprint = fingerprint
+        self.first_seen = seen_at
+        self.last_seen = seen_at
+        self.count = 1
+        # Alert raised for the first sighting, if any
+        self.alert_id = None
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "occurrences": self.count,
+            "first_seen": _iso(self.first_seen),
+            "last_seen": _iso(self.last_seen),
+        }
+
+
+class FindingDeduplicator:
+    """
+    Remembers PANs by HMAC-SHA256 under a secret key - never the PAN itself
+    Findings sit in an OrderedDict in last-seen order, so expiry and the
+    size bound drop entries from the front in O(1) each. The key comes from
+    AEGIS_DEDUP_KEY, or is random per process; without it the stored
+    fingerprints cannot be matched to card numbers.
+    """
+
+    def __init__(self, key: Optional[bytes] = None, ttl: float = DEDUP_TTL,
+                 max_findings: int = MAX_FINDINGS):
+        self._key = key if key is not None else default_key()
+        self.ttl = ttl
+        self.max_findings = max_findings
+        self.findings: "OrderedDict[str, Finding]" = OrderedDict()
+        self.repeats_suppressed = 0
+
+    def fingerprint(self, digits: str) -> str:
+        """Keyed hash of a PAN's digits (hex)"""
+        return pan_fingerprint(self._key, digits)
+
+    def observe(self, fingerprint: str, now: Optional[float] = None) -> Tuple[Finding, bool]:
+        """
+        Record a sighting - (finding, True) the first time, else the
+        existing finding with its count and last_seen updated
+        """
+        now = time.time() if now is None else now
+        self.expire(now)
+        finding = self.findings.get(fingerprint)
+        if finding is not None:
+            finding.count += 1
+            finding.last_seen = now
+            self.findings.move_to_end(fingerprint)
+            self.repeats_suppressed += 1
+            return finding, False
+
+        finding = self.findings[fingerprint] = Finding(fingerprint, now)
+        while len(self.findings) > self.max_findings:
+            self.findings.popitem(last=False)
+        return finding, True
+
+    def split(self, violations: Iterable, now: Optional[float] = None) -> Tuple[List, List]:
+        """(first sightings, repeats) of fingerprinted violations"""
+        new, repeats = [], []
+        for violation in violations:
+            _, first = self.observe(violation.fingerprint, now)
+            (new if first else repeats).append(violation)
+        return new, repeats
+
+    def get(self, fingerprint: str) -> Optional[Finding]:
+        return self.findings.get(fingerprint)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Forget findings last seen more than ttl ago; returns how many"""
+        cutoff = (time.time() if now is None else now) - self.ttl
+        expired = 0
+        while self.findings:
+            oldest = next(iter(self.findings.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            self.findings.popitem(last=False)
+            expired += 1
+        return expired
+
+    def __len__(self) -> int:
+        return len(self.findings)
+
+    def stats(self) -> dict:
+        return {"findings": len(self.findings), "repeats_suppressed": self.repeats_suppressed}
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
@@ -0,0 +1,265 @@
+"""
+Agent 3: Transaction Monitor - pluggable PII detectors
+Registry of pattern + validator detectors compiled into one scanning pass
+"""
+import heapq
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .luhn import luhn_check_batch
+from .scanner import CHUNK_SIZE, PanScanner, Scannable, _profile
+
+# Detector profile: digits -> '9', separators -> '-', ASCII letters -> 'a',
+# the structural characters below stay themselves, the rest -> '.'
+_STRUCTURAL = b"@%;=^"
+_DETECTOR_PROFILE_TABLE = bytes(
+    ord("9") if 48 <= c <= 57
+    else ord("-") if c in b"- \t\n\r\x0b\x0c"
+    else ord("a") if 65 <= c <= 90 or 97 <= c <= 122
+    else c if c in _STRUCTURAL
+    else ord(".")
+    for c in range(256)
+)
+
+# Batch validator: candidate strings in, one verdict per candidate out
+Validator = Callable[[List[str]], List[bool]]
+
+
+class Detector:
+    """
+    One kind of sensitive data: a regex, a prefilter seed and a validator
+    `seed` is a regex over the detector profile that every match must
+    contain; `max_span` bounds the length of a match. The pattern must be
+    ASCII and use no named groups.
+    """
+
+    def __init__(self, name: str, pattern: str, seed: str, max_span: int,
+                 validate: Validator, mask: Callable[[str], str],
+                 severity: str = "high", recommendation: str = "Remove or tokenize this data",
+                 describe: Optional[Callable[[str], dict]] = None):
+        self.name = name
+        self.pattern = pattern
+        self.seed = seed
+        self.max_span = max_span
+        self.validate = validate
+        self.mask = mask
+        self.severity = severity
+        self.recommendation = recommendation
+        # Extra fields for a confirmed hit (e.g. card type for PANs)
+        self.describe = describe
+
+
+class DetectionEngine(PanScanner):
+    """
+    Every registered detector compiled into one pass
+    The profile is built once per block and each detector's seed - a
+    literal-led regex, so the search runs at memchr speed - is found in it;
+    the merged seed hits give windows where the combined detector pattern
+    runs, and `match.lastgroup` routes each candidate to its detector's
+    validator. A new detector adds one fast profile search, not another
+    regex pass over the text. Streaming, chunking and line tracking come
+    from PanScanner unchanged.
+    """
+
+    def __init__(self, detectors: Iterable[Detector]):
+        self.detectors: Dict[str, Detector] = {detector.name: detector for detector in detectors}
+        super().__init__(
+            {name: detector.pattern for name, detector in self.detectors.items()},
+            max(detector.max_span for detector in self.detectors.values()),
+            "|".join(f"(?:{detector.seed})" for detector in self.detectors.values()),
+        )
+        # Searched one by one: an alternation of seeds loses the literal
+        # prefix search and walks the profile position by position
+        self.seed_patterns = [
+            (re.compile(detector.seed.encode()), detector.max_span) for detector in self.detectors.values()
+        ]
+
+    def iter_windows(self, text: Scannable, pos: int = 0,
+                     endpos: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yield merged (start, end) windows around every seed hit
+        Each seed is padded by its own detector's max_span. Any match
+        contains its detector's seed, so it lies inside that seed's window;
+        overlapping windows merge, so a match is never cut at a window edge.
+        """
+        if endpos is None:
+            endpos = len(text)
+        window_start = window_end = None
+
+        for block_start in range(pos, endpos, CHUNK_SIZE):
+            block_end = min(block_start + CHUNK_SIZE, endpos)
+            profile = _profile(text, block_start, min(block_end + self.max_span, endpos),
+                               _DETECTOR_PROFILE_TABLE)
+
+            seeds = heapq.merge(*(_with_span(pattern.finditer(profile), span)
+                                  for pattern, span in self.seed_patterns),
+                                key=lambda item: item[0].start())
+            for seed, span in seeds:
+                if seed.start() >= block_end - block_start:
+                    break
+                start = max(block_start + seed.start() - span, pos)
+                end = min(block_start + seed.end() + span, endpos)
+                if window_end is not None and start <= window_end:
+                    window_end = max(window_end, end)
+                    continue
+                if window_end is not None:
+                    yield window_start, window_end
+                window_start, window_end = start, end
+
+        if window_end is not None:
+            yield window_start, window_end
+
+    def validate(self, matches: List[re.Match]) -> List[bool]:
+        """Route each candidate to its detector's validator, in batches per detector"""
+        verdicts = [False] * len(matches)
+        by_detector: Dict[str, List[int]] = {}
+        for index, match in enumerate(matches):
+            by_detector.setdefault(match.lastgroup, []).append(index)
+
+        for name, indexes in by_detector.items():
+            candidates = [_as_text(matches[i].group()) for i in indexes]
+            for index, valid in zip(indexes, self.detectors[name].validate(candidates)):
+                verdicts[index] = valid
+        return verdicts
+
+
+class DetectorRegistry:
+    """Ordered set of detectors - earlier ones win where matches overlap"""
+
+    def __init__(self, detectors: Iterable[Detector] = ()):
+        self.detectors: Dict[str, Detector] = {}
+        for detector in detectors:
+            self.register(detector)
+
+    def register(self, detector: Detector, before: Optional[str] = None) -> None:
+        """Add or replace a detector, optionally ahead of another one"""
+        self.detectors.pop(detector.name, None)
+        if before is None or before not in self.detectors:
+            self.detectors[detector.name] = detector
+            return
+        ordered = list(self.detectors.items())
+        index = [name for name, _ in ordered].index(before)
+        ordered.insert(index, (detector.name, detector))
+        self.detectors = dict(ordered)
+
+    def unregister(self, name: str) -> None:
+        self.detectors.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self.detectors)
+
+    def compile(self) -> DetectionEngine:
+        """Build the single-pass engine for the current detectors"""
+        if not self.detectors:
+            raise ValueError("No detectors registered")
+        return DetectionEngine(self.detectors.values())
+
+
+def _with_span(seeds: Iterator[re.Match], span: int) -> Iterator[Tuple[re.Match, int]]:
+    for seed in seeds:
+        yield seed, span
+
+
+def _as_text(candidate) -> str:
+    return candidate if isinstance(candidate, str) else bytes(candidate).decode("ascii")
+
+
+# Validators
+
+def iban_valid(candidate: str) -> bool:
+    """ISO 13616 check: 15-34 characters and mod 97 of the rearranged digits is 1"""
+    iban = candidate.replace(" ", "").upper()
+    if not 15 <= len(iban) <= 34:
+        return False
+    rearranged = iban[4:] + iban[:4]
+    return int("".join(str(int(char, 36)) for char in rearranged)) % 97 == 1
+
+
+def ssn_valid(candidate: str) -> bool:
+    """US SSN area/group/serial rules (no 000, 666 or 9xx area, no zero group or serial)"""
+    area, group, serial = candidate.split("-")
+    return area not in ("000", "666") and area[0] != "9" and group != "00" and serial != "0000"
+
+
+def email_valid(candidate: str) -> bool:
+    """Length limits of RFC 5321 and no empty labels"""
+    local = candidate.rpartition("@")[0]
+    return len(local) <= 64 and len(candidate) <= 254 and ".." not in candidate
+
+
+def track_valid(candidates: List[str]) -> List[bool]:
+    """Track 1/2 data is only reported when its PAN passes Luhn"""
+    return luhn_check_batch([_track_pan(candidate) for candidate in candidates])
+
+
+def _track_pan(candidate: str) -> str:
+    return re.split(r"[\^=]", candidate[2:] if candidate.startswith("%") else candidate[1:])[0]
+
+
+class _Each:
+    """Batch validator from a per-candidate check (picklable for worker pools)"""
+
+    def __init__(self, check: Callable[[str], bool]):
+        self.check = check
+
+    def __call__(self, candidates: List[str]) -> List[bool]:
+        return [self.check(candidate) for candidate in candidates]
+
+
+# Masks
+
+def _keep_ends(value: str, first: int, last: int) -> str:
+    return value[:first] + "*" * max(len(value) - first - last, 0) + value[-last:]
+
+
+def mask_iban(candidate: str) -> str:
+    return _keep_ends(candidate.replace(" ", ""), 4, 4)
+
+
+def mask_ssn(candidate: str) -> str:
+    return "***-**-" + candidate[-4:]
+
+
+def mask_email(candidate: str) -> str:
+    local, _, domain = candidate.rpartition("@")
+    return f"{local[:1]}***@{domain}"
+
+
+def mask_track(candidate: str) -> str:
+    sentinel = candidate[:2] if candidate.startswith("%") else candidate[:1]
+    return f"{sentinel}{_keep_ends(_track_pan(candidate), 4, 4)}[track data]"
+
+
+def default_detectors(pan_pattern: str, mask_pan: Callable[[str], str],
+                      describe_pan: Optional[Callable[[str], dict]] = None) -> List[Detector]:
+    """
+    The built-in detectors in priority order
+    Track data goes first so the PAN inside it is reported once, as track data.
+    """
+    return [
+        Detector(
+            "track",
+            r"%B[0-9]{13,19}\^[^^\n]{2,26}\^[0-9]{4}|;[0-9]{13,19}=[0-9]{4}",
+            r"%a9{13}|;9{13}", 53, track_valid, mask_track, severity="critical",
+            recommendation="Full track data must never be stored after authorization",
+        ),
+        Detector(
+            "pan", pan_pattern, r"9999-?9999", 19, luhn_check_batch, mask_pan,
+            severity="critical", recommendation="Immediately remove or encrypt this data",
+            describe=describe_pan,
+        ),
+        Detector(
+            "iban",
+            r"\b[A-Z]{2}[0-9]{2}(?: ?[0-9A-Z]{4}){2,7}(?: ?[0-9A-Z]{1,4})?\b",
+            r"aa99", 44, _Each(iban_valid), mask_iban,
+        ),
+        Detector(
+            "ssn", r"\b[0-9]{3}-[0-9]{2}-[0-9]{4}\b", r"999-99-9999", 11, _Each(ssn_valid), mask_ssn,
+        ),
+        Detector(
+            "email",
+            r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]{1,64}@"
+            r"[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,3}\.[A-Za-z]{2,24}\b",
+            r"@", 345, _Each(email_valid), mask_email, severity="medium",
+        ),
+    ]
@@ -0,0 +1,227 @@
+"""
+Agent 3: Transaction Monitor - distribution drift
+Per-merchant country and response-code mix against a baseline, scored by PSI
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from .card_testing import APPROVED
+from .records import iso_timestamp
+from .sketches import lru_lookup
+
+# Length of the window compared against the baseline (seconds)
+WINDOW = 3600
+
+# Attempts in the window before it is scored, and between re-scores after that
+MIN_EVENTS = 50
+SCORE_EVERY = 25
+
+# Windows of at least MIN_EVENTS folded into the baseline before scoring starts
+MIN_BASELINE_WINDOWS = 3
+
+# Weight of each new window in the baseline mix (exponential average)
+BASELINE_WEIGHT = 0.1
+
+# PSI that raises an alert - 0.25 is the usual "significant shift" line
+PSI_ALERT = 0.25
+
+# Categories kept per histogram; the rest share one bucket
+MAX_CATEGORIES = 24
+OTHER = "OTHER"
+
+# Floor for empty bins, so PSI stays finite
+EPSILON = 1e-4
+
+# Pseudo-attempts at the baseline mix added to each window before scoring -
+# damps the sampling noise of a window only MIN_EVENTS long
+PRIOR_EVENTS = 20
+
+# Merchants tracked at once; the longest idle are dropped past this
+MAX_MERCHANTS = 20_000
+
+
+class MerchantMix:
+    """
+    One merchant's country and response-code histograms for the current
+    window, and the baseline shares both are compared against
+    """
+    __slots__ = ("window_start", "last_seen", "countries", "codes", "attempts", "baseline_countries",
+                 "baseline_codes", "baseline_windows", "next_score", "scores", "alerted", "last_alert")
+
+    def __init__(self, timestamp: float):
+        self.window_start = timestamp
+        self.last_seen = timestamp
+        self.countries: Dict[str, int] = {}
+        self.codes: Dict[str, int] = {}
+        self.attempts = 0
+        self.baseline_countries: Dict[str, float] = {}
+        self.baseline_codes: Dict[str, float] = {}
+        self.baseline_windows = 0
+        self.next_score = MIN_EVENTS
+        self.scores = None  # (country PSI, response-code PSI) at the last score
+        self.alerted = False
+        self.last_alert = None
+
+    def roll(self, timestamp: float, window: float) -> None:
+        """Start a new window, folding the old one's shares into the baseline"""
+        if self.attempts >= MIN_EVENTS:
+            weight = 1.0 if self.baseline_windows == 0 else BASELINE_WEIGHT
+            _fold(self.baseline_countries, self.countries, self.attempts, weight)
+            _fold(self.baseline_codes, self.codes, self.attempts, weight)
+            self.baseline_windows += 1
+        self.window_start = timestamp - (timestamp - self.window_start) % window
+        self.countries = {}
+        self.codes = {}
+        self.attempts = 0
+        self.next_score = MIN_EVENTS
+        self.scores = None
+        self.alerted = False
+
+
+class DistributionDriftDetector:
+    """
+    Streaming country / response-code mix drift per merchant
+    Each merchant keeps two capped histograms for the current window and
+    the exponentially averaged shares of past windows. The window is
+    scored with the population stability index against that baseline
+    once it has MIN_EVENTS attempts and every SCORE_EVERY after; a score
+    walks at most 2 * MAX_CATEGORIES bins, so an event costs O(1). A
+    merchant alerts at most once per window, when either PSI reaches
+    psi_alert.
+    """
+
+    def __init__(self, window: float = WINDOW, psi_alert: float = PSI_ALERT,
+                 max_merchants: int = MAX_MERCHANTS):
+        self.window = window
+        self.psi_alert = psi_alert
+        self.max_merchants = max_merchants
+        # Capped LRU table - see lru_lookup
+        self.merchants: "OrderedDict[str, MerchantMix]" = OrderedDict()
+        self.events = 0
+
+    def observe(self, merchant_id: str, country: Optional[str], response_code: str = APPROVED,
+                timestamp: Optional[float] = None) -> Optional[dict]:
+        """Count one attempt; returns an alert dict when the window's mix drifts past psi_alert"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.events += 1
+        mix = lru_lookup(self.merchants, merchant_id, self.max_merchants)
+        if mix is None:
+            mix = self.merchants[merchant_id] = MerchantMix(timestamp)
+        elif timestamp - mix.window_start >= self.window:
+            mix.roll(timestamp, self.window)
+        mix.last_seen = timestamp
+
+        mix.attempts += 1
+        _count(mix.countries, country or OTHER)
+        _count(mix.codes, response_code)
+        if mix.attempts < mix.next_score or mix.baseline_windows < MIN_BASELINE_WINDOWS:
+            return None
+        mix.next_score = mix.attempts + SCORE_EVERY
+
+        mix.scores = (_psi(mix.countries, mix.attempts, mix.baseline_countries),
+                      _psi(mix.codes, mix.attempts, mix.baseline_codes))
+        if mix.alerted or max(mix.scores) < self.psi_alert:
+            return None
+        mix.alerted = True
+        mix.last_alert = timestamp
+        return self._alert(merchant_id, mix, timestamp)
+
+    def observe_many(self, events: Iterable[dict]) -> List[dict]:
+        """Count event dicts (merchant_id, country, response_code, timestamp); returns alerts"""
+        alerts = []
+        for event in events:
+            alert = self.observe(event["merchant_id"], event.get("country"),
+                                 event.get("response_code", APPROVED), event.get("timestamp"))
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def drift(self, merchant_id: str) -> Optional[dict]:
+        """Latest PSI scores and the top shifts for a merchant, or None if unseen"""
+        mix = self.merchants.get(merchant_id)
+        if mix is None:
+            return None
+        country_psi, code_psi = mix.scores if mix.scores is not None else (None, None)
+        return {
+            "entity_id": merchant_id,
+            "country_psi": _round(country_psi),
+            "response_code_psi": _round(code_psi),
+            "attempts": mix.attempts,
+            "baseline_windows": mix.baseline_windows,
+            "top_countries": _top_shares(mix.countries, mix.attempts),
+            "baseline_top_countries": _top_shares(mix.baseline_countries, 1.0),
+            "decline_rate": round(1 - mix.codes.get(APPROVED, 0) / mix.attempts, 3) if mix.attempts else 0.0,
+            "baseline_decline_rate": round(1 - mix.baseline_codes.get(APPROVED, 0.0), 3)
+                                     if mix.baseline_windows else None,
+        }
+
+    def anomalous(self, merchant_id: str) -> bool:
+        """Whether the merchant's current window has drifted past psi_alert"""
+        mix = self.merchants.get(merchant_id)
+        return mix is not None and mix.alerted
+
+    def _alert(self, merchant_id: str, mix: MerchantMix, timestamp: float) -> dict:
+        report = self.drift(merchant_id)
+        country_psi, code_psi = mix.scores
+        shifted = [name for name, psi in (("country mix", country_psi), ("decline mix", code_psi))
+                   if psi >= self.psi_alert]
+        return {
+            "type": "distribution_shift",
+            "severity": "critical" if len(shifted) == 2 else "high",
+            **report,
+            "detected_at": iso_timestamp(timestamp),
+            "description": f"{' and '.join(shifted).capitalize()} shifted from baseline at {merchant_id}",
+        }
+
+
+def _count(histogram: Dict[str, int], category: str) -> None:
+    """Add one to a category, folding new ones into OTHER once the histogram is full"""
+    if category in histogram:
+        histogram[category] += 1
+    elif len(histogram) < MAX_CATEGORIES:
+        histogram[category] = 1
+    else:
+        histogram[OTHER] = histogram.get(OTHER, 0) + 1
+
+
+def _fold(baseline: Dict[str, float], counts: Dict[str, int], total: int, weight: float) -> None:
+    """Move baseline shares `weight` of the way towards a window's shares"""
+    for category in baseline:
+        baseline[category] *= 1.0 - weight
+    for category, count in counts.items():
+        baseline[category] = baseline.get(category, 0.0) + weight * count / total
+    # Keep the baseline as compact as the histograms
+    if len(baseline) > MAX_CATEGORIES:
+        ranked = sorted(baseline.items(), key=lambda item: item[1], reverse=True)
+        baseline.clear()
+        baseline.update(ranked[:MAX_CATEGORIES - 1])
+        baseline[OTHER] = baseline.get(OTHER, 0.0) + sum(share for _, share in ranked[MAX_CATEGORIES - 1:])
+
+
+def _psi(counts: Dict[str, int], total: int, baseline: Dict[str, float]) -> float:
+    """Population stability index of a window's counts (smoothed towards the baseline) against it"""
+    psi = 0.0
+    smoothed = total + PRIOR_EVENTS
+    for category, count in counts.items():
+        share = baseline.get(category, 0.0)
+        current = max((count + PRIOR_EVENTS * share) / smoothed, EPSILON)
+        expected = max(share, EPSILON)
+        psi += (current - expected) * math.log(current / expected)
+    for category, share in baseline.items():
+        if category not in counts and share > EPSILON:
+            current = max(PRIOR_EVENTS * share / smoothed, EPSILON)
+            psi += (current - share) * math.log(current / share)
+    return psi
+
+
+def _top_shares(histogram: Dict[str, float], total: float, limit: int = 3) -> Dict[str, float]:
+    if not total:
+        return {}
+    ranked = sorted(histogram.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return {category: round(count / total, 3) for category, count in ranked}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
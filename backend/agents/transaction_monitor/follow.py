@@ -0,0 +1,185 @@
+"""
+Agent 3: Transaction Monitor - tail-following scans
+Scans only bytes appended since the last run, with per-file checkpoints on disk
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+from .records import PanViolation
+from .scanner import LineTracker
+
+# Leading bytes hashed to tell a rewritten file from the one checkpointed
+HEAD_BYTES = 256
+
+# Seconds between polls in follow mode
+POLL_INTERVAL = 1.0
+
+
+class CheckpointStore:
+    """
+    Per-file scan positions in a small JSON file
+    Each entry holds the file's inode and device, its size at the last
+    poll, the offset and line number scanning has reached and a hash of
+    its first bytes. Saves go through a temp file and os.replace, so a
+    crash leaves either the old or the new checkpoints, never half of them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as checkpoint_file:
+                self.entries = json.load(checkpoint_file)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        self.entries[key] = entry
+
+    def drop(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(handle, "w") as temp_file:
+                json.dump(self.entries, temp_file, indent=2, sort_keys=True)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class LogFollower:
+    """
+    Incremental scanner for append-only, rotating logs
+    Each poll scans a file from its checkpoint to the last complete line,
+    so a PAN being written as we read is picked up whole next time. A new
+    inode at the path means rotation: the old file is found by inode in
+    the same directory and finished before the new one starts at 0. A
+    file shorter than its checkpoint, or whose first bytes changed, was
+    truncated and is rescanned from the start. A file's checkpoint is
+    saved once its violations have been consumed, so after a restart
+    nothing is missed and only a batch in flight at the crash can repeat.
+    """
+
+    def __init__(self, monitor, paths: Iterable[str], checkpoint_path: str):
+        self.monitor = monitor
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.store = CheckpointStore(checkpoint_path)
+        self.stats = {"polls": 0, "bytes_scanned": 0, "rotations": 0, "truncations": 0}
+
+    def poll(self) -> Iterator[PanViolation]:
+        """Scan whatever was appended to each file since its checkpoint"""
+        self.stats["polls"] += 1
+        for path in self.paths:
+            yield from self._poll_file(path)
+
+    def follow(self, interval: float = POLL_INTERVAL,
+               stop: Optional[Callable[[], bool]] = None) -> Iterator[PanViolation]:
+        """Poll forever (or until `stop()` is true), yielding violations as they appear"""
+        while stop is None or not stop():
+            yield from self.poll()
+            time.sleep(interval)
+
+    def _poll_file(self, path: str) -> Iterator[PanViolation]:
+        checkpoint = self.store.get(path)
+        try:
+            status = os.stat(path)
+        except FileNotFoundError:
+            status = None
+
+        if checkpoint is not None and (status is None or not _same_file(status, checkpoint)):
+            # Rotated - finish the old file wherever it went, then forget it
+            rotated = _find_by_inode(path, checkpoint)
+            if rotated is not None:
+                yield from self._scan(rotated, path, checkpoint, final=True)
+            self.stats["rotations"] += 1
+            self.store.drop(path)
+            self.store.save()
+            checkpoint = None
+
+        if status is None:
+            return
+        if checkpoint is not None and (status.st_size < checkpoint["offset"]
+                                       or not _same_head(path, checkpoint)):
+            self.stats["truncations"] += 1
+            checkpoint = None
+        if checkpoint is None:
+            checkpoint = {"inode": status.st_ino, "device": status.st_dev, "size": 0,
+                          "offset": 0, "line": 1, "head": None, "head_bytes": 0}
+        yield from self._scan(path, path, checkpoint, final=False)
+
+    def _scan(self, file_path: str, key: str, checkpoint: dict, final: bool) -> Iterator[PanViolation]:
+        """Scan file_path from the checkpoint - to EOF when final, else to the last newline"""
+        offset = checkpoint["offset"]
+        violations = []
+        with open(file_path, "rb") as log_file:
+            size = os.fstat(log_file.fileno()).st_size
+            if checkpoint["head_bytes"] < min(size, HEAD_BYTES):
+                head = log_file.read(HEAD_BYTES)
+                checkpoint["head"] = hashlib.sha256(head).hexdigest()
+                checkpoint["head_bytes"] = len(head)
+            if size > offset:
+                with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    end = size if final else mapped.rfind(b"\n", offset, size) + 1
+                    if end > offset:
+                        view = memoryview(mapped)[offset:end]
+                        try:
+                            lines = LineTracker(checkpoint["line"], offset)
+                            hits = self.monitor.scanner.iter_located_matches(view, base=offset, lines=lines)
+                            violations = list(self.monitor._iter_violations(hits, file_path))
+                            lines.advance(view, offset, end)
+                        finally:
+                            view.release()
+                        self.stats["bytes_scanned"] += end - offset
+                        checkpoint["offset"] = end
+                        checkpoint["line"] = lines.line
+
+        yield from violations
+        # Only now - the consumer has taken every violation before this point
+        checkpoint["size"] = size
+        if not final:
+            self.store.put(key, checkpoint)
+            self.store.save()
+
+
+def _same_file(status: os.stat_result, checkpoint: dict) -> bool:
+    return status.st_ino == checkpoint["inode"] and status.st_dev == checkpoint["device"]
+
+
+def _same_head(path: str, checkpoint: dict) -> bool:
+    """Whether the file still starts with the bytes hashed at the checkpoint"""
+    if not checkpoint["head_bytes"]:
+        return True
+    with open(path, "rb") as log_file:
+        head = log_file.read(checkpoint["head_bytes"])
+    return hashlib.sha256(head).hexdigest() == checkpoint["head"]
+
+
+def _find_by_inode(path: str, checkpoint: dict) -> Optional[str]:
+    """Where a rotated file went - a sibling of `path` with the checkpointed inode"""
+    directory = os.path.dirname(path)
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return None
+    with entries:
+        for entry in entries:
+            try:
+                status = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if entry.is_file(follow_symlinks=False) and _same_file(status, checkpoint):
+                return entry.path
+    return None
@@ -0,0 +1,93 @@
+"""
+Agent 3: Transaction Monitor - Luhn validation
+Table-driven batch validator with an optional NumPy path for digit arrays
+"""
+from typing import Dict, Iterable, List, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Candidate = Union[str, bytes, bytearray, memoryview]
+
+# Digit sum of 2*d for d = 0..9 (the "doubled" Luhn digits)
+DOUBLED_DIGITS = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# Same table over ASCII digits, for bytes.translate
+_DOUBLE_TABLE = bytes.maketrans(b"0123456789", bytes(48 + d for d in DOUBLED_DIGITS))
+
+# Every byte that is not an ASCII digit - stripped before validation
+_NON_DIGITS = bytes(c for c in range(256) if not 48 <= c <= 57)
+
+# Candidates per batch validation call in the scan pipelines
+VALIDATE_BATCH = 1024
+
+# Below this many same-length candidates the pure Python path is faster
+NUMPY_MIN_BATCH = 64
+
+
+def _ascii_digits(candidate: Candidate) -> bytes:
+    """Strip separators, returning the candidate's digits as ASCII bytes"""
+    if isinstance(candidate, str):
+        if not candidate.isascii():
+            # str patterns match any Unicode decimal digit - normalise them
+            return "".join(str(int(c)) for c in candidate if c.isdecimal()).encode()
+        candidate = candidate.encode()
+    elif isinstance(candidate, memoryview):
+        candidate = candidate.tobytes()
+    return bytes(candidate.translate(None, _NON_DIGITS))
+
+
+def luhn_valid_digits(digits: bytes) -> bool:
+    """
+    Luhn check for a string of ASCII digits
+    Undoubled digits are summed straight from their byte values, doubled
+    ones go through the lookup table first - no per-digit int() or branch.
+    """
+    total = sum(digits[-1::-2]) + sum(digits[-2::-2].translate(_DOUBLE_TABLE))
+    return (total - 48 * len(digits)) % 10 == 0
+
+
+def luhn_check_array(digits) -> "np.ndarray":
+    """
+    Validate a (n, width) array of digit values 0-9, one PAN per row
+    Returns a boolean array of length n. Requires NumPy.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for luhn_check_array")
+
+    digits = np.asarray(digits, dtype=np.uint8)
+    width = digits.shape[1]
+    # Every second digit counting from the right is doubled
+    doubled = np.arange(width) % 2 == width % 2
+    values = np.where(doubled, np.asarray(DOUBLED_DIGITS, dtype=np.uint8)[digits], digits)
+    return values.sum(axis=1, dtype=np.uint16) % 10 == 0
+
+
+def luhn_check_batch(candidates: Iterable[Candidate]) -> List[bool]:
+    """
+    Validate many card number candidates at once
+    Separators are ignored and 13-19 digits are required. Large groups of
+    same-length candidates go through the NumPy path when it is installed.
+    """
+    digit_strings = [_ascii_digits(candidate) for candidate in candidates]
+    results = [False] * len(digit_strings)
+
+    # Group valid-length candidates by width
+    by_width: Dict[int, List[int]] = {}
+    for index, digits in enumerate(digit_strings):
+        if 13 <= len(digits) <= 19:
+            by_width.setdefault(len(digits), []).append(index)
+
+    for width, indexes in by_width.items():
+        if np is not None and len(indexes) >= NUMPY_MIN_BATCH:
+            joined = b"".join(digit_strings[i] for i in indexes)
+            matrix = np.frombuffer(joined, dtype=np.uint8).reshape(-1, width) - 48
+            for index, valid in zip(indexes, luhn_check_array(matrix).tolist()):
+                results[index] = valid
+        else:
+            for index in indexes:
+                results[index] = luhn_valid_digits(digit_strings[index])
+
+    return results
@@ -0,0 +1,140 @@
+"""
+Agent 3: Transaction Monitor - multi-core log scanning
+Splits files into line-aligned shards and scans them in a process pool
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .compression import is_compressed_file
+from .records import PanViolation
+from .scanner import add_scan_stats, new_scan_stats
+
+# Target shard size for splitting large files (32 MiB)
+SHARD_SIZE = 32 << 20
+
+# Per-process monitor, set by the pool initializer
+_worker_monitor = None
+
+
+def plan_shards(path: str, shard_size: int = SHARD_SIZE) -> List[Tuple[int, int]]:
+    """
+    Split a file into (start, end) byte ranges that end on a newline
+    Files smaller than shard_size come back as a single shard
+    """
+    size = os.path.getsize(path)
+    shards = []
+    start = 0
+
+    with open(path, "rb") as log_file:
+        while start < size:
+            end = min(start + shard_size, size)
+            if end < size:
+                # Extend to the end of the current line
+                log_file.seek(end)
+                end += len(log_file.readline())
+            shards.append((start, end))
+            start = end
+
+    return shards
+
+
+def _init_worker(monitor) -> None:
+    """Pool initializer - keep one monitor per worker process"""
+    global _worker_monitor
+    _worker_monitor = monitor
+
+
+def _scan_shard(task: Tuple[str, int, int]) -> Tuple[List[PanViolation], int, dict]:
+    """
+    Scan one shard in a worker process
+    Returns (violations, newline_count, stats); lines in violations are
+    shard-local, byte offsets file-wide. The shard is scanned as raw bytes,
+    never decoded; stats include the worker's `seconds` on it and, with
+    suppressions set, what it `suppressed` - the parent's counts never see it.
+    """
+    path, start, end = task
+    started = time.perf_counter()
+    suppressions = _worker_monitor.suppressions
+    before = dict(suppressions.counts) if suppressions is not None else None
+    with open(path, "rb") as log_file:
+        log_file.seek(start)
+        data = log_file.read(end - start)
+
+    stats = new_scan_stats()
+    # Shards start on a line boundary, so columns need no adjustment
+    hits = _worker_monitor.scanner.iter_located_matches(data, base=start, stats=stats)
+    violations = list(_worker_monitor._iter_violations(hits, str(path)))
+    stats["seconds"] = time.perf_counter() - started
+    if suppressions is not None:
+        stats["suppressed"] = suppressions.counted_since(before)
+
+    return violations, data.count(b"\n"), stats
+
+
+def _scan_whole(path: str) -> Tuple[List[PanViolation], int, dict]:
+    """
+    Scan a compressed file whole in a worker - it cannot be split by byte
+    range - with the same result shape as _scan_shard (lines already file-wide)
+    """
+    stats = new_scan_stats()
+    violations = list(_worker_monitor.scan_file(path, stats=stats))
+    return violations, 0, stats
+
+
+def _scan_task(task: Tuple[str, int, Optional[int]]) -> Tuple[List[PanViolation], int, dict]:
+    """A shard, or with no end a whole compressed file"""
+    if task[2] is None:
+        return _scan_whole(task[0])
+    return _scan_shard(task)
+
+
+def merge_shards(results: Iterable[Tuple[List[PanViolation], int, dict]]) -> Tuple[List[PanViolation], dict]:
+    """
+    One file's (violations, stats) from its _scan_shard results in file order
+    Line numbers are shifted by the newlines of earlier shards; stats are
+    summed, with `lines` the file's newline count.
+    """
+    merged, stats, line_base = [], {"lines": 0}, 0
+    for violations, newlines, shard_stats in results:
+        for violation in violations:
+            violation.line += line_base
+            merged.append(violation)
+        line_base += newlines
+        add_scan_stats(stats, shard_stats)
+    stats["lines"] = line_base
+    return merged, stats
+
+
+def iter_parallel_scan(monitor, paths: Iterable[str], workers: Optional[int] = None,
+                       shard_size: int = SHARD_SIZE, stats: Optional[dict] = None) -> Iterator[PanViolation]:
+    """
+    Scan many files across a process pool, yielding violations in file order
+    Large files are split at newline boundaries; shard results are merged in
+    order and their line numbers shifted by the newlines of earlier shards,
+    so `line`, `column` and `byte_offset` are global to each file. A PAN
+    whose digit groups are split across a line break is not matched across
+    shards. Compressed files are decompressed and scanned whole, one task each.
+    Worker prefilter counters are summed into `stats` when given.
+    """
+    tasks = []
+    for path in paths:
+        if is_compressed_file(path):
+            tasks.append((path, 0, None))
+        else:
+            tasks.extend((path, start, end) for start, end in plan_shards(path, shard_size))
+    line_base = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(monitor,)) as executor:
+        results = executor.map(_scan_task, tasks)
+        for (_, start, _), (violations, newlines, shard_stats) in zip(tasks, results):
+            if stats is not None:
+                add_scan_stats(stats, shard_stats)
+            if start == 0:
+                line_base = 0
+            for violation in violations:
+                violation.line += line_base
+                yield violation
+            line_base += newlines
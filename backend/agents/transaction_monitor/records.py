@@ -0,0 +1,135 @@
+"""
+Agent 3: Transaction Monitor - compact violation records
+Slotted hit records for the scan loop, serialized to the API dict shape on demand
+"""
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+# (card type, issuer country, product type) - shared with the BIN table
+Issuer = Tuple[str, Optional[str], Optional[str]]
+
+
+class PanViolation:
+    """
+    One Luhn-valid PAN hit
+    Constant fields are class attributes and the issuer tuple and timestamp
+    are shared between records, so a hit costs one small slotted object.
+    Call to_dict() at the API edge.
+    """
+    __slots__ = ("matched_pattern", "issuer", "source", "detected_at",
+                 "byte_offset", "line", "column", "context", "record", "field", "fingerprint")
+
+    type = "pan_detected"
+    severity = "critical"
+    recommendation = "Immediately remove or encrypt this data"
+
+    def __init__(self, matched_pattern: str, issuer: Issuer, source: str, detected_at: str,
+                 byte_offset: Optional[int] = None, line: Optional[int] = None,
+                 column: Optional[int] = None):
+        self.matched_pattern = matched_pattern
+        self.issuer = issuer
+        self.source = source
+        self.detected_at = detected_at
+        self.byte_offset = byte_offset
+        self.line = line
+        self.column = column
+        # ContextSnippet of masked surrounding lines, when requested
+        self.context = None
+        # Record index and field name for CSV / NDJSON scans
+        self.record = None
+        self.field = None
+        # Keyed hash of the PAN when deduplication is on
+        self.fingerprint = None
+
+    @property
+    def card_type(self) -> str:
+        return self.issuer[0]
+
+    def to_dict(self) -> dict:
+        """Violation in the API shape"""
+        card_type, issuer_country, product_type = self.issuer
+        violation = {
+            "type": self.type,
+            "severity": self.severity,
+            "matched_pattern": self.matched_pattern,
+            "card_type": card_type,
+            "issuer_country": issuer_country,
+            "product_type": product_type,
+            "source": self.source,
+            "detected_at": self.detected_at,
+            "recommendation": self.recommendation,
+        }
+        if self.byte_offset is not None:
+            violation["byte_offset"] = self.byte_offset
+        if self.line is not None:
+            violation["line"] = self.line
+            violation["column"] = self.column
+        if self.context is not None:
+            violation["context"] = self.context.to_dict()
+        if self.record is not None:
+            violation["record"] = self.record
+            violation["field"] = self.field
+            violation["column"] = self.column
+        if self.fingerprint is not None:
+            violation["fingerprint"] = self.fingerprint
+        return violation
+
+    def __repr__(self) -> str:
+        return f"PanViolation({self.matched_pattern!r}, {self.card_type!r}, source={self.source!r})"
+
+
+class PiiViolation:
+    """
+    A validated hit from any registered detector
+    Type, severity and recommendation come from the shared detector
+    """
+    __slots__ = ("detector", "matched_pattern", "details", "source", "detected_at",
+                 "byte_offset", "line", "column", "context")
+
+    def __init__(self, detector, matched_pattern: str, source: str, detected_at: str,
+                 details: Optional[dict] = None):
+        self.detector = detector
+        self.matched_pattern = matched_pattern
+        self.details = details
+        self.source = source
+        self.detected_at = detected_at
+        self.byte_offset = None
+        self.line = None
+        self.column = None
+        self.context = None
+
+    def to_dict(self) -> dict:
+        """Violation in the API shape"""
+        violation = {
+            "type": f"{self.detector.name}_detected",
+            "severity": self.detector.severity,
+            "matched_pattern": self.matched_pattern,
+            **(self.details or {}),
+            "source": self.source,
+            "detected_at": self.detected_at,
+            "recommendation": self.detector.recommendation,
+        }
+        if self.byte_offset is not None:
+            violation["byte_offset"] = self.byte_offset
+        if self.line is not None:
+            violation["line"] = self.line
+            violation["column"] = self.column
+        return violation
+
+    def __repr__(self) -> str:
+        return f"PiiViolation({self.detector.name!r}, {self.matched_pattern!r}, source={self.source!r})"
+
+
+def to_dicts(violations: Iterable) -> List[dict]:
+    """Serialize records for an API response"""
+    return [violation.to_dict() for violation in violations]
+
+
+def utc_timestamp() -> str:
+    """Current time in the API's ISO format - read once per scan batch"""
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def iso_timestamp(timestamp: float) -> str:
+    """Unix time in the same ISO format - for streaming alerts, stamped with the event's time"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
@@ -0,0 +1,148 @@
+"""
+Agent 3: Transaction Monitor - log sanitization
+Writes masked copies of logs (or masks them in place) in the scan pass
+"""
+import mmap
+import time
+from itertools import islice
+from typing import BinaryIO, Optional
+
+from .compression import detect_compression, open_log_stream
+from .luhn import VALIDATE_BATCH
+from .scanner import CHUNK_SIZE, LineTracker, Scannable, record_throughput
+
+# Digits kept visible at each end of a masked PAN
+MASK_KEEP_FIRST = 4
+MASK_KEEP_LAST = 4
+
+
+def mask_span(candidate: bytes) -> bytes:
+    """
+    Mask a matched PAN without changing its length
+    Digits other than the first and last four become 'X'; separators stay,
+    so 4532-0151-1283-0366 becomes 4532-XXXX-XXXX-0366.
+    """
+    masked = bytearray(candidate)
+    digits = [i for i, char in enumerate(masked) if 48 <= char <= 57]
+    for i in digits[MASK_KEEP_FIRST:len(digits) - MASK_KEEP_LAST]:
+        masked[i] = ord("X")
+    return bytes(masked)
+
+
+def redact_text(monitor, text: Scannable) -> Scannable:
+    """Copy of an in-memory str or bytes with every Luhn-valid PAN masked"""
+    matches = list(monitor.scanner.iter_matches(text))
+    valid = monitor.luhn_check_batch([match.group() for match in matches])
+    if not any(valid):
+        return text
+
+    binary = not isinstance(text, str)
+    pieces = []
+    last = 0
+    for match, is_pan in zip(matches, valid):
+        if is_pan:
+            masked = mask_span(match.group() if binary else match.group().encode())
+            pieces.append(text[last:match.start()])
+            pieces.append(masked if binary else masked.decode())
+            last = match.end()
+    pieces.append(text[last:])
+    return (b"" if binary else "").join(pieces)
+
+
+class _PassThroughReader:
+    """
+    Reader that keeps everything it hands the scanner for the output copy
+    Masks are applied to the pending bytes; whatever the scanner can no
+    longer match against (all but the last overlap) is written out on the
+    next read, so pending stays at about one chunk.
+    """
+
+    def __init__(self, source: BinaryIO, dest: BinaryIO, guard: int):
+        self.source = source
+        self.dest = dest
+        self.guard = guard
+        self.pending = bytearray()
+        self.pending_start = 0
+        self.read_end = 0
+
+    def read(self, size: int) -> bytes:
+        self.flush(self.read_end - self.guard)
+        chunk = self.source.read(size)
+        self.pending += chunk
+        self.read_end += len(chunk)
+        return chunk
+
+    def mask(self, offset: int, masked: bytes) -> None:
+        start = offset - self.pending_start
+        self.pending[start:start + len(masked)] = masked
+
+    def flush(self, upto: int) -> None:
+        size = upto - self.pending_start
+        if size > 0:
+            self.dest.write(self.pending[:size])
+            del self.pending[:size]
+            self.pending_start = upto
+
+
+def redact_stream(monitor, source: BinaryIO, dest: BinaryIO, source_name: str = "stream",
+                  chunk_size: int = CHUNK_SIZE, stats: Optional[dict] = None) -> list:
+    """
+    Stream a masked copy of `source` into `dest`, returning the violations
+    Each buffer's hits are validated and masked before the scanner reads
+    on, which is what lets the reader flush everything ahead of the overlap.
+    Suppressed PANs are masked too; they are only left out of the violations.
+    """
+    started = time.perf_counter()
+    readable, compression, counter = open_log_stream(source)
+    reader = _PassThroughReader(readable, dest, monitor.scanner.max_span + 1)
+    violations = []
+
+    lines = LineTracker()
+    batches = monitor.scanner.iter_chunked_batches(reader.read, chunk_size, stats=stats, lines=lines)
+    for base, matches in batches:
+        hits = [(base, m, lines.locate(m.string, base, base + m.start())) for m in matches]
+        for offset, match, violation in monitor._validate_hits(hits, source_name, keep_suppressed=True):
+            reader.mask(offset + match.start(), mask_span(match.group()))
+            if violation is not None:
+                violations.append(violation)
+    reader.flush(reader.read_end)
+
+    if stats is not None:
+        if compression:
+            stats["compression"] = compression
+            stats["bytes_compressed"] = counter.bytes_read
+        record_throughput(stats, time.perf_counter() - started)
+    return violations
+
+
+def redact_file_in_place(monitor, path: str, stats: Optional[dict] = None) -> list:
+    """
+    Mask every Luhn-valid PAN directly in the file, returning the violations
+    Masks keep the byte length, so the file is patched through a writable
+    memory map without a second copy on disk. Suppressed PANs are masked
+    but not returned.
+    """
+    started = time.perf_counter()
+    violations = []
+
+    with open(path, "r+b") as log_file:
+        head = log_file.read(8)
+        if detect_compression(head):
+            raise ValueError(f"{path} is compressed - give an output path to redact it")
+
+        if head:
+            with mmap.mmap(log_file.fileno(), 0) as mapped:
+                hits = monitor.scanner.iter_located_matches(mapped, stats=stats)
+                while True:
+                    batch = list(islice(hits, VALIDATE_BATCH))
+                    if not batch:
+                        break
+                    for _, match, violation in monitor._validate_hits(batch, str(path), keep_suppressed=True):
+                        mapped[match.start():match.end()] = mask_span(match.group())
+                        if violation is not None:
+                            violations.append(violation)
+                mapped.flush()
+
+    if stats is not None:
+        record_throughput(stats, time.perf_counter() - started)
+    return violations
@@ -0,0 +1,274 @@
+"""
+Agent 3: Transaction Monitor - detection rules
+Rule applicability indexed by data type, jurisdiction and entity type, with timed disables
+"""
+import heapq
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .detectors import DetectionEngine, Detector
+from .records import iso_timestamp
+
+# Jurisdiction of rules that apply everywhere
+GLOBAL = "GLOBAL"
+
+# Built-in detectors that only apply in some jurisdictions; the rest are GLOBAL
+DEFAULT_JURISDICTIONS = {
+    "iban": ("EU", "GB"),
+    "ssn": ("US",),
+}
+
+# Disable length when none is given (seconds) - the chat flow's "24 hours"
+DEFAULT_DISABLE = 24 * 3600
+
+# Longest temporary disable accepted (seconds)
+MAX_DISABLE = 30 * 24 * 3600
+
+
+class DetectionRule:
+    """
+    One detection_rules row (ARCHITECTURE.md section 14) bound to its detector
+    Empty applies_to / entity_types mean every data type / entity type.
+    disabled_until (unix seconds) turns the rule off everywhere until then.
+    """
+
+    def __init__(self, detector: Detector, applies_to: Iterable[str] = (),
+                 jurisdictions: Iterable[str] = (GLOBAL,), entity_types: Iterable[str] = (),
+                 is_active: bool = True, disabled_until: Optional[float] = None,
+                 disabled_by: Optional[str] = None, disabled_reason: Optional[str] = None):
+        self.name = detector.name
+        self.detector = detector
+        self.applies_to = tuple(applies_to)
+        self.jurisdictions = tuple(jurisdictions) or (GLOBAL,)
+        self.entity_types = tuple(entity_types)
+        self.is_active = is_active
+        self.disabled_until = disabled_until
+        self.disabled_by = disabled_by
+        self.disabled_reason = disabled_reason
+
+    def enabled(self, now: float) -> bool:
+        return self.is_active and (self.disabled_until is None or self.disabled_until <= now)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "severity": self.detector.severity,
+            "applies_to": list(self.applies_to),
+            "jurisdictions": list(self.jurisdictions),
+            "entity_types": list(self.entity_types),
+            "is_active": self.is_active,
+            "disabled_until": _iso(self.disabled_until),
+            "disabled_by": self.disabled_by,
+            "disabled_reason": self.disabled_reason,
+        }
+
+
+class RuleSet:
+    """
+    Compiled snapshot of the enabled rules - fixed once published
+    Enabled rules are bucketed by data type, jurisdiction and entity type
+    (each bucket already holding the wildcard rules), so picking a scan's
+    rules is two or three frozenset intersections, cached per combination.
+    Each distinct combination of rules is compiled into one
+    DetectionEngine, and the combinations of every known data type and
+    jurisdiction are compiled up front.
+    """
+
+    def __init__(self, rules: Iterable[DetectionRule], version: int, now: float):
+        self.rules: Dict[str, DetectionRule] = {rule.name: rule for rule in rules}
+        self.version = version
+        enabled = [rule for rule in self.rules.values() if rule.enabled(now)]
+        self.enabled: FrozenSet[str] = frozenset(rule.name for rule in enabled)
+        self.by_data_type = _buckets(enabled, "applies_to", wildcard=())
+        self.by_jurisdiction = _buckets(enabled, "jurisdictions", wildcard=(GLOBAL,))
+        self.by_entity_type = _buckets(enabled, "entity_types", wildcard=())
+        self._selections: Dict[Tuple, FrozenSet[str]] = {}
+        self._engines: Dict[FrozenSet[str], Optional[DetectionEngine]] = {}
+        for data_type in [None, *self.by_data_type]:
+            for jurisdiction in [None, *self.by_jurisdiction]:
+                self.engine(self.select(data_type, jurisdiction, None))
+
+    def select(self, data_type: Optional[str], jurisdiction: Optional[str],
+               entity_type: Optional[str]) -> FrozenSet[str]:
+        """Names of the enabled rules for a scan - None leaves that dimension unfiltered"""
+        key = (data_type, jurisdiction, entity_type)
+        names = self._selections.get(key)
+        if names is None:
+            names = self.enabled
+            for value, buckets in ((data_type, self.by_data_type), (jurisdiction, self.by_jurisdiction),
+                                   (entity_type, self.by_entity_type)):
+                if value is not None:
+                    names = names & buckets.get(value, buckets[None])
+            names = self._selections[key] = names
+        return names
+
+    def engine(self, names: FrozenSet[str]) -> Optional[DetectionEngine]:
+        """Compiled engine for a set of rules (in rule order), or None if the set is empty"""
+        if names in self._engines:
+            return self._engines[names]
+        engine = None
+        if names:
+            engine = DetectionEngine(rule.detector for rule in self.rules.values() if rule.name in names)
+        self._engines[names] = engine
+        return engine
+
+
+class RulesEngine:
+    """
+    The live rule set behind TransactionMonitor.scan_with_rules()
+    Scans read `ruleset`, an immutable snapshot, once at their start;
+    changes build and compile a new snapshot off to the side and swap the
+    reference, so in-flight scans finish on the rules they started with.
+    Per-entity disables are a dict lookup at scan time; their expiry
+    times sit in a heap, and a scan only pops it when its head is due -
+    nothing walks the disables to compare timestamps. Rule-wide disables
+    expire the same way, with a swap to a snapshot that has the rule back.
+    """
+
+    def __init__(self, rules: Iterable[DetectionRule] = ()):
+        self._lock = threading.Lock()
+        # entity_id -> {rule name: disabled until}
+        self._entity_disables: Dict[str, Dict[str, float]] = {}
+        # (expires at, entity_id or None for rule-wide, rule name)
+        self._expiries: List[Tuple[float, str, str]] = []
+        self.ruleset = RuleSet(rules, 1, time.time())
+
+    def __getstate__(self) -> dict:
+        # Worker pools pickle the monitor - the lock stays behind
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def replace(self, rules: Iterable[DetectionRule]) -> RuleSet:
+        """Hot-swap in a new rule list"""
+        with self._lock:
+            return self._swap(list(rules))
+
+    def bind(self, detectors: Iterable[Detector]) -> RuleSet:
+        """Follow a detector registry: keep existing rules' settings, add GLOBAL rules for new detectors"""
+        with self._lock:
+            current = self.ruleset.rules
+            rules = []
+            for detector in detectors:
+                rule = current.get(detector.name)
+                if rule is None:
+                    rule = DetectionRule(detector, jurisdictions=DEFAULT_JURISDICTIONS.get(detector.name, (GLOBAL,)))
+                rule.detector = detector
+                rules.append(rule)
+            return self._swap(rules)
+
+    def engine_for(self, data_type: Optional[str] = None, jurisdiction: Optional[str] = None,
+                   entity_id: Optional[str] = None, entity_type: Optional[str] = None,
+                   now: Optional[float] = None) -> Optional[DetectionEngine]:
+        """Compiled engine for the rules that apply to a scan, or None when none do"""
+        now = time.time() if now is None else now
+        if self._expiries and self._expiries[0][0] <= now:
+            self._expire(now)
+        ruleset = self.ruleset
+        names = ruleset.select(data_type, jurisdiction, entity_type)
+        disabled = self._entity_disables.get(entity_id) if entity_id is not None else None
+        if disabled:
+            names = names.difference(disabled)
+        return ruleset.engine(names)
+
+    def disable(self, rule_name: str, entity_id: Optional[str] = None, duration: float = DEFAULT_DISABLE,
+                disabled_by: Optional[str] = None, reason: Optional[str] = None,
+                now: Optional[float] = None) -> dict:
+        """Turn a rule off for one entity (or everywhere) for `duration` seconds"""
+        if rule_name not in self.ruleset.rules:
+            raise KeyError(f"Unknown rule {rule_name}")
+        if not 0 < duration <= MAX_DISABLE:
+            raise ValueError(f"Disable duration must be between 0 and {MAX_DISABLE} seconds")
+        now = time.time() if now is None else now
+        until = now + duration
+        with self._lock:
+            if entity_id is None:
+                rule = self.ruleset.rules[rule_name]
+                rule.disabled_until, rule.disabled_by, rule.disabled_reason = until, disabled_by, reason
+                self._swap(list(self.ruleset.rules.values()), now)
+            else:
+                # A new dict, so a scan reading the old one is unaffected
+                disabled = dict(self._entity_disables.get(entity_id, {}))
+                disabled[rule_name] = until
+                self._entity_disables[entity_id] = disabled
+            heapq.heappush(self._expiries, (until, entity_id, rule_name))
+        return {
+            "rule": rule_name,
+            "entity_id": entity_id,
+            "disabled_until": _iso(until),
+            "disabled_by": disabled_by,
+            "reason": reason,
+        }
+
+    def enable(self, rule_name: str, entity_id: Optional[str] = None) -> None:
+        """Lift a disable early; its heap entry is dropped when it comes due"""
+        with self._lock:
+            if entity_id is None:
+                rule = self.ruleset.rules.get(rule_name)
+                if rule is not None and rule.disabled_until is not None:
+                    rule.disabled_until = rule.disabled_by = rule.disabled_reason = None
+                    self._swap(list(self.ruleset.rules.values()))
+            elif rule_name in self._entity_disables.get(entity_id, {}):
+                self._drop_entity_disable(entity_id, rule_name)
+
+    def disabled_for(self, entity_id: str) -> Dict[str, str]:
+        """Rules disabled for an entity and until when"""
+        return {name: _iso(until) for name, until in self._entity_disables.get(entity_id, {}).items()}
+
+    def _expire(self, now: float) -> None:
+        """Pop every due disable off the heap - stale entries for lifted or extended ones are skipped"""
+        with self._lock:
+            swap = False
+            while self._expiries and self._expiries[0][0] <= now:
+                until, entity_id, rule_name = heapq.heappop(self._expiries)
+                if entity_id is None:
+                    rule = self.ruleset.rules.get(rule_name)
+                    if rule is not None and rule.disabled_until == until:
+                        rule.disabled_until = rule.disabled_by = rule.disabled_reason = None
+                        swap = True
+                elif self._entity_disables.get(entity_id, {}).get(rule_name) == until:
+                    self._drop_entity_disable(entity_id, rule_name)
+            if swap:
+                self._swap(list(self.ruleset.rules.values()), now)
+
+    def _drop_entity_disable(self, entity_id: str, rule_name: str) -> None:
+        disabled = dict(self._entity_disables[entity_id])
+        del disabled[rule_name]
+        if disabled:
+            self._entity_disables[entity_id] = disabled
+        else:
+            del self._entity_disables[entity_id]
+
+    def _swap(self, rules: List[DetectionRule], now: Optional[float] = None) -> RuleSet:
+        """Compile the new snapshot, then publish it with one reference assignment"""
+        ruleset = RuleSet(rules, self.ruleset.version + 1, time.time() if now is None else now)
+        self.ruleset = ruleset
+        return ruleset
+
+
+def _buckets(rules: List[DetectionRule], field: str, wildcard: tuple) -> Dict[Optional[str], FrozenSet[str]]:
+    """
+    value -> names of the rules applying to it, each bucket including the
+    wildcard rules; None holds the wildcard rules alone (for unknown values)
+    """
+    everywhere = frozenset(rule.name for rule in rules
+                           if not getattr(rule, field) or set(getattr(rule, field)) & set(wildcard))
+    specific: Dict[str, set] = {}
+    for rule in rules:
+        for value in getattr(rule, field):
+            if value not in wildcard:
+                specific.setdefault(value, set()).add(rule.name)
+    buckets: Dict[Optional[str], FrozenSet[str]] = {value: everywhere | names for value, names in specific.items()}
+    buckets[None] = everywhere
+    return buckets
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return iso_timestamp(timestamp)
@@ -0,0 +1,322 @@
+"""
+Agent 3: Transaction Monitor - scanning engine
+Compiles every PAN pattern into one alternation so text is walked once
+"""
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# Default read size for streaming scans (1 MiB)
+CHUNK_SIZE = 1 << 20
+
+# Text or any bytes-like buffer (bytes, bytearray, memoryview, mmap)
+Scannable = Union[str, bytes, bytearray, memoryview]
+
+# (buffer offset, match, (line, column[, context])) - a located candidate
+Hit = Tuple[int, re.Match, tuple]
+
+# Prefilter profile: ASCII digits -> '9', PAN separators -> '-', rest -> '.'
+_PROFILE_TABLE = bytes(
+    ord("9") if 48 <= c <= 57 else ord("-") if c in b"- \t\n\r\x0b\x0c" else ord(".")
+    for c in range(256)
+)
+
+# Rest of a digit run: digits joined by at most one separator
+_RUN_TAIL = r"(?:[-\s]?[0-9])*"
+
+# How far back to look per step when a digit run crosses a profile block
+_RUN_STEP = 64
+
+
+def new_scan_stats() -> dict:
+    """Counters a scan fills in - input size and what the prefilter skipped"""
+    return {"bytes_total": 0, "bytes_skipped": 0, "candidate_windows": 0}
+
+
+def add_scan_stats(total: dict, part: dict) -> dict:
+    """Sum one scan's counters into another's; nested dicts are summed key by key"""
+    for key, value in part.items():
+        if isinstance(value, dict):
+            add_scan_stats(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def record_throughput(stats: dict, seconds: float) -> dict:
+    """
+    Add elapsed time and MB/s to scan stats
+    `mb_per_s` is over uncompressed input; `compressed_mb_per_s` is added
+    when the scan counted `bytes_compressed`.
+    """
+    stats["seconds"] = round(seconds, 6)
+    if seconds > 0:
+        stats["mb_per_s"] = round(stats["bytes_total"] / seconds / 1e6, 2)
+        if "bytes_compressed" in stats:
+            stats["compressed_mb_per_s"] = round(stats["bytes_compressed"] / seconds / 1e6, 2)
+    return stats
+
+
+def _profile(text: Scannable, start: int, end: int, table: bytes = _PROFILE_TABLE) -> bytes:
+    """Digit/separator/other profile of text[start:end], one byte per character"""
+    chunk = text[start:end]
+    if isinstance(chunk, str):
+        chunk = chunk.encode("ascii", "replace")
+    elif not isinstance(chunk, (bytes, bytearray)):
+        chunk = bytes(chunk)
+    return chunk.translate(table)
+
+
+def _is_digit(text: Scannable, index: int) -> bool:
+    char = text[index]
+    if isinstance(char, int):
+        return 48 <= char <= 57
+    return "0" <= char <= "9"
+
+
+def _newlines(text: Scannable, start: int, end: int) -> Tuple[int, int]:
+    """(count, index of the last one or -1) of newlines in text[start:end]"""
+    if isinstance(text, (str, bytes, bytearray)):
+        newline = "\n" if isinstance(text, str) else b"\n"
+        count = text.count(newline, start, end)
+        return count, text.rfind(newline, start, end) if count else -1
+
+    # mmap / memoryview - count through bounded slices, never a full copy
+    count, last = 0, -1
+    for block_start in range(start, end, CHUNK_SIZE):
+        block = bytes(text[block_start:min(block_start + CHUNK_SIZE, end)])
+        block_count = block.count(b"\n")
+        if block_count:
+            count += block_count
+            last = block_start + block.rfind(b"\n")
+    return count, last
+
+
+class LineTracker:
+    """
+    Line and column of ascending stream positions
+    Newlines are counted only between consecutive positions, so locating
+    every hit costs one pass over the input in total. Positions may come
+    from successive chunk buffers as long as each buffer still holds the
+    text since the previous call; columns are 1-based, in characters for
+    str input and bytes otherwise.
+    """
+    __slots__ = ("line", "line_start", "position")
+
+    def __init__(self, line: int = 1, position: int = 0):
+        self.line = line
+        self.line_start = position
+        self.position = position
+
+    def advance(self, buffer: Scannable, base: int, position: int) -> None:
+        """Count the newlines up to `position`; `base` is the buffer's offset"""
+        if position <= self.position:
+            return
+        count, last = _newlines(buffer, self.position - base, position - base)
+        if count:
+            self.line += count
+            self.line_start = base + last + 1
+        self.position = position
+
+    def locate(self, buffer: Scannable, base: int, position: int) -> tuple:
+        """(line, column) of an absolute position at or after the previous one"""
+        self.advance(buffer, base, position)
+        return self.line, position - self.line_start + 1
+
+    def close(self, buffer: Scannable, base: int, end: int) -> None:
+        """Called once the input ends at `end` - nothing left to count here"""
+
+
+class PanScanner:
+    """Single-pass PAN matcher built from named card patterns"""
+
+    def __init__(self, patterns: Dict[str, str], max_span: int,
+                 prefilter_seed: str, min_digits: int = 13):
+        # Insertion order is priority order: at any position the first
+        # alternative that matches wins, so brand patterns go before generic
+        self.pattern_names = list(patterns)
+        # Longest text any pattern can match - sizes the chunk overlap
+        self.max_span = max_span
+        # ASCII classes keep the patterns in step with the prefilter profile
+        combined = "|".join(f"(?P<{name}>{pattern})" for name, pattern in patterns.items())
+        self.combined_pattern = re.compile(combined, re.ASCII)
+        # Same patterns for bytes input - scanned in place, never decoded
+        self.combined_bytes_pattern = re.compile(combined.encode())
+        self._run_tail = re.compile(_RUN_TAIL, re.ASCII)
+        self._bytes_run_tail = re.compile(_RUN_TAIL.encode())
+        # Profile-space literal that every PAN match must contain
+        self.seed_pattern = re.compile(prefilter_seed.encode())
+        self.min_digits = min_digits
+
+    def pattern_for(self, text: Scannable) -> re.Pattern:
+        """Combined pattern matching the input type - str or bytes-like"""
+        return self.combined_pattern if isinstance(text, str) else self.combined_bytes_pattern
+
+    def iter_windows(self, text: Scannable, pos: int = 0,
+                     endpos: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (start, end) of digit runs that could hold a PAN
+        The text is mapped to a digit/separator/other profile with one
+        translate call per block and searched for the seed literal in C;
+        only runs around a seed with at least min_digits digits come back.
+        Runs are maximal (digits joined by single separators) and no pattern
+        matches across a run boundary, so scanning runs alone finds every
+        match. Profile memory is one block, whatever the input size.
+        """
+        if endpos is None:
+            endpos = len(text)
+        run_tail = self._run_tail if isinstance(text, str) else self._bytes_run_tail
+        run_end = pos
+
+        for block_start in range(pos, endpos, CHUNK_SIZE):
+            block_end = min(block_start + CHUNK_SIZE, endpos)
+            # Overlap the next block so seeds across the edge are seen
+            profile = _profile(text, block_start, min(block_end + self.max_span, endpos))
+
+            for seed in self.seed_pattern.finditer(profile, max(run_end - block_start, 0)):
+                if seed.start() >= block_end - block_start:
+                    break
+                if block_start + seed.start() < run_end:
+                    continue  # inside the run just scanned
+
+                # Walk back to the start of the run: past the last non-digit
+                # character, then past any double separator
+                start = profile.rfind(b".", 0, seed.start()) + 1
+                double = profile.rfind(b"--", start, seed.start())
+                if double >= 0:
+                    start = double + 2
+                start += block_start
+                if start == block_start > pos:
+                    start = self._run_start(text, pos, start)
+                while not _is_digit(text, start):  # strip leading separators
+                    start += 1
+
+                run_end = run_tail.match(text, block_start + seed.end(), endpos).end()
+                if _profile(text, start, run_end).count(b"9") >= self.min_digits:
+                    yield start, run_end
+
+    @staticmethod
+    def _run_start(text: Scannable, pos: int, start: int) -> int:
+        """Follow a digit run back past the start of the current profile block"""
+        while start > pos:
+            low = max(start - _RUN_STEP, pos)
+            # Include text[start] so a double separator across the step shows
+            profile = _profile(text, low, start + 1)
+            dot = profile.rfind(b".")
+            double = profile.rfind(b"--")
+            run_break = max(dot + 1 if dot >= 0 else -1, double + 2 if double >= 0 else -1)
+            if run_break >= 0:
+                return low + run_break
+            start = low
+        return pos
+
+    def iter_matches(self, text: Scannable, pos: int = 0, endpos: Optional[int] = None,
+                     stats: Optional[dict] = None) -> Iterator[re.Match]:
+        """
+        Yield candidate PAN matches in text order
+        Matches never overlap: once a span is accepted the scan resumes after
+        it, so a number hit by both a brand and the generic pattern is
+        reported once. `match.lastgroup` names the pattern that won.
+        The combined pattern only runs inside prefilter windows; pass a
+        `new_scan_stats()` dict to see how much input it skipped. Bytes-like
+        input is matched in place - positions are byte offsets.
+        """
+        if endpos is None:
+            endpos = len(text)
+        if stats is not None:
+            stats["bytes_total"] += endpos - pos
+            stats["bytes_skipped"] += endpos - pos
+        pattern = self.pattern_for(text)
+
+        for start, end in self.iter_windows(text, pos, endpos):
+            if stats is not None:
+                stats["bytes_skipped"] -= end - start
+                stats["candidate_windows"] += 1
+            # One character past the run gives \b its real context
+            yield from pattern.finditer(text, start, min(end + 1, endpos))
+
+    def iter_located_matches(self, text: Scannable, base: int = 0, stats: Optional[dict] = None,
+                             lines: Optional[LineTracker] = None) -> Iterator[Hit]:
+        """
+        Yield (base, match, (line, column)) for an in-memory buffer
+        `base` is the buffer's offset in its file; lines count from 1 at it.
+        """
+        if lines is None:
+            lines = LineTracker(position=base)
+        for match in self.iter_matches(text, stats=stats):
+            yield base, match, lines.locate(text, base, base + match.start())
+        lines.close(text, base, base + len(text))
+
+    def iter_chunked_matches(self, read: Callable[[int], Scannable], chunk_size: int = CHUNK_SIZE,
+                             stats: Optional[dict] = None,
+                             lines: Optional[LineTracker] = None) -> Iterator[Hit]:
+        """
+        Yield (offset, match, (line, column)) for a stream consumed in chunks
+        `offset` is the stream position of the match's buffer, so
+        `offset + match.start()` is its absolute position.
+        """
+        if lines is None:
+            lines = LineTracker()
+        for base, matches in self.iter_chunked_batches(read, chunk_size, stats=stats, lines=lines):
+            for match in matches:
+                yield base, match, lines.locate(match.string, base, base + match.start())
+
+    def iter_chunked_batches(self, read: Callable[[int], Scannable], chunk_size: int = CHUNK_SIZE,
+                             stats: Optional[dict] = None,
+                             lines: Optional[LineTracker] = None) -> Iterator[Tuple[int, List[re.Match]]]:
+        """
+        Yield (offset, matches) per buffer for a stream read in fixed-size chunks
+        Buffers overlap by max_span + 1 characters: a match is only accepted
+        once enough text follows it to be final, anything later is rescanned
+        with the next chunk. PANs across a boundary are found whole and none
+        is reported twice. Each buffer's matches arrive before the next
+        chunk is read, and every later match starts at or after the end of
+        the previous read minus the overlap. Memory stays at one chunk plus
+        the overlap. A `lines` tracker is carried past each buffer before it
+        is dropped, so matches located against it (in order, before the
+        next buffer is requested) get stream-wide line numbers.
+        """
+        guard = self.max_span + 1
+        buffer = None
+        base = 0
+        scan_from = 0
+
+        while True:
+            chunk = read(chunk_size)
+            eof = not chunk
+            buffer = chunk if buffer is None else buffer + chunk
+            if stats is not None:
+                stats["bytes_total"] += len(chunk)
+                stats["bytes_skipped"] += len(chunk)
+            pattern = self.pattern_for(buffer)
+
+            # Positions before `safe` can no longer change with more input
+            safe = len(buffer) if eof else len(buffer) - guard
+            resume = max(scan_from, safe)
+            matches = []
+
+            for start, end in self.iter_windows(buffer, scan_from):
+                if start >= safe:
+                    break
+                if stats is not None:
+                    stats["bytes_skipped"] -= min(end, safe) - start
+                    stats["candidate_windows"] += 1
+                for match in pattern.finditer(buffer, start, min(end + 1, len(buffer))):
+                    if match.start() >= safe:
+                        break
+                    matches.append(match)
+                    resume = max(resume, match.end())
+
+            if matches:
+                yield base, matches
+            if eof:
+                if lines is not None:
+                    lines.close(buffer, base, base + len(buffer))
+                return
+
+            # Carry the unsettled tail plus one character of \b context
+            keep = max(resume - 1, 0)
+            if lines is not None:
+                lines.advance(buffer, base, base + keep)
+            base += keep
+            buffer = buffer[keep:]
+            scan_from = resume - keep
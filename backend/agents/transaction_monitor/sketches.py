@@ -0,0 +1,142 @@
+"""
+Agent 3: Transaction Monitor - probabilistic sketches
+Fixed-memory distinct counts (HyperLogLog) and frequency tallies (Count-Min),
+and the capped per-merchant tables the streaming detectors keep them in
+"""
+import hashlib
+import math
+from array import array
+from collections import OrderedDict
+
+_MASK64 = (1 << 64) - 1
+
+
+def stable_hash(item) -> int:
+    """
+    64-bit BLAKE2b hash of a str, bytes or other item (by repr)
+    Unlike hash(), small ints are spread over the whole range and the
+    value is the same in every process, so sketches built in different
+    workers can be merged.
+    """
+    if isinstance(item, str):
+        data = item.encode()
+    elif isinstance(item, (bytes, bytearray)):
+        data = bytes(item)
+    else:
+        data = repr(item).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """
+    Distinct-count estimate in 2**precision one-byte registers
+    Standard error is about 1.04 / sqrt(2**precision) - 3% at precision 10
+    (1 KiB). The harmonic sum is kept up to date as registers change, so
+    count() is O(1) rather than a pass over the registers.
+    """
+    __slots__ = ("precision", "registers", "_sum", "_zeros")
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        size = 1 << precision
+        self.registers = bytearray(size)
+        # sum of 2**-register scaled by 2**64, exact in integers
+        self._sum = size << 64
+        self._zeros = size
+
+    def add_hash(self, hashed: int) -> None:
+        """Add an item by its 64-bit hash"""
+        hashed &= _MASK64
+        precision = self.precision
+        index = hashed >> (64 - precision)
+        rest = hashed & ((1 << (64 - precision)) - 1)
+        rank = 64 - precision - rest.bit_length() + 1
+        old = self.registers[index]
+        if rank > old:
+            self.registers[index] = rank
+            self._sum += (1 << (64 - rank)) - (1 << (64 - old))
+            if old == 0:
+                self._zeros -= 1
+
+    def add(self, item) -> None:
+        self.add_hash(stable_hash(item))
+
+    def count(self) -> float:
+        size = len(self.registers)
+        estimate = _alpha(size) * size * size * (1 << 64) / self._sum
+        if estimate <= 2.5 * size and self._zeros:
+            return size * math.log(size / self._zeros)  # linear counting for small sets
+        return estimate
+
+    def clear(self) -> None:
+        size = len(self.registers)
+        self.registers[:] = bytes(size)
+        self._sum = size << 64
+        self._zeros = size
+
+
+class CountMinSketch:
+    """
+    Approximate counts for an open-ended key space in depth x width counters
+    Estimates never undercount; with width 2**14 the overcount is at most
+    about total / 6000 with high probability. Row indexes come from one
+    64-bit hash split in two (Kirsch-Mitzenmacher), so an update hashes once.
+    """
+    __slots__ = ("depth", "width", "counters")
+
+    def __init__(self, width_bits: int = 14, depth: int = 4):
+        self.depth = depth
+        self.width = 1 << width_bits
+        self.counters = array("I", bytes(4 * depth * self.width))
+
+    def _indexes(self, hashed: int) -> list:
+        """Flat counter index of the item in each row"""
+        width = self.width
+        low = hashed & 0xFFFFFFFF
+        high = (hashed >> 32) & 0xFFFFFFFF | 1
+        mask = width - 1
+        return [row * width + ((low + row * high) & mask) for row in range(self.depth)]
+
+    def add_hash(self, hashed: int, count: int = 1) -> int:
+        """Add to an item by hash; returns its new estimate (conservative update)"""
+        indexes = self._indexes(hashed)
+        counters = self.counters
+        estimate = min(map(counters.__getitem__, indexes)) + count
+        for i in indexes:
+            if counters[i] < estimate:
+                counters[i] = estimate
+        return estimate
+
+    def estimate_hash(self, hashed: int) -> int:
+        return min(map(self.counters.__getitem__, self._indexes(hashed)))
+
+    def add(self, item, count: int = 1) -> int:
+        return self.add_hash(stable_hash(item), count)
+
+    def estimate(self, item) -> int:
+        return self.estimate_hash(stable_hash(item))
+
+
+def lru_lookup(table: OrderedDict, key, limit: int):
+    """
+    Entry for key in a table kept in least-recently-seen order, or None
+    Found entries move to the back; on a miss the front (least recently
+    seen) entry is dropped if the table holds `limit`, so the caller can
+    add the new one - O(1) either way.
+    """
+    entry = table.get(key)
+    if entry is not None:
+        table.move_to_end(key)
+    elif len(table) >= limit:
+        table.popitem(last=False)
+    return entry
+
+
+def _alpha(size: int) -> float:
+    if size <= 16:
+        return 0.673
+    if size <= 32:
+        return 0.697
+    if size <= 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / size)
@@ -0,0 +1,296 @@
+"""
+Agent 3: Transaction Monitor - structured record scanning
+Streams CSV and NDJSON records and scans only the fields that can hold a PAN
+"""
+import csv
+import io
+import json
+import re
+import time
+from itertools import chain, islice
+from operator import itemgetter
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .compression import open_log_stream
+from .luhn import luhn_check_batch
+from .records import PanViolation, utc_timestamp
+from .scanner import record_throughput
+
+# Records scanned together as one joined text
+RECORD_BATCH = 4096
+
+# Records sampled to decide which fields to scan
+SAMPLE_RECORDS = 100
+
+# Join records and field values in a batch - not PAN separators, so no
+# match spans two fields
+_RECORD_SEPARATOR = "\x1e"
+_FIELD_SEPARATOR = "\x1f"
+
+# Digits a value needs before it could hold a PAN
+_MIN_PAN_DIGITS = 13
+_MAX_PAN_DIGITS = 19
+
+# A digit-only field is scanned when at least this share of its sampled
+# PAN-length values pass Luhn - card numbers nearly all do, random numeric
+# IDs about one in ten
+MIN_LUHN_PASS_RATE = 0.5
+
+# Fewer PAN-length values than this in the sample are too few to judge a
+# digit-only field by, and it is scanned
+_MIN_LUHN_VALUES = 10
+
+_LETTER = re.compile(r"[A-Za-z]")
+_NON_DIGIT = re.compile(r"\D")
+
+
+def detect_format(first_line: str) -> str:
+    """'ndjson' when the first record is a JSON object, else 'csv'"""
+    return "ndjson" if first_line.lstrip().startswith("{") else "csv"
+
+
+def could_hold_pan(value: str) -> bool:
+    """False for values with no letters and too few digits - amounts, dates, short IDs"""
+    return bool(_LETTER.search(value)) or len(_NON_DIGIT.sub("", value)) >= _MIN_PAN_DIGITS
+
+
+def flatten(record: dict, prefix: str = "") -> Iterator[Tuple[str, str]]:
+    """
+    (dotted field name, text) for every scalar in a JSON record
+    Strings and integers are kept; floats, booleans and nulls cannot be PANs
+    """
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, str):
+            yield name, value
+        elif isinstance(value, int) and not isinstance(value, bool):
+            yield name, str(value)
+        elif isinstance(value, dict):
+            yield from flatten(value, name + ".")
+        elif isinstance(value, list):
+            yield from flatten({str(i): item for i, item in enumerate(value)}, name + ".")
+
+
+class FieldSelector:
+    """
+    Which fields of a record set are scanned
+    Explicit `fields` are scanned as given. Otherwise the first
+    SAMPLE_RECORDS records decide: a field is skipped when none of its
+    sampled values could hold a PAN (no letters, fewer than 13 digits),
+    or when its values are all digits and too few of the PAN-length ones
+    pass Luhn (a numeric ID column, not card numbers). Fields first seen
+    after the sample are scanned.
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None):
+        self.fields: Optional[Set[str]] = set(fields) if fields is not None else None
+        self.skipped: Set[str] = set()
+
+    def learn(self, sample: List[List[Tuple[str, str]]]) -> None:
+        """Pick the fields to skip from sampled (name, value) records"""
+        if self.fields is not None:
+            return
+        seen: Set[str] = set()
+        scanned: Set[str] = set()
+        numeric: Dict[str, List[str]] = {}  # digit-only field -> its PAN-length values
+        for record in sample:
+            for name, value in record:
+                seen.add(name)
+                if name in scanned or not could_hold_pan(value):
+                    continue
+                if _LETTER.search(value) or len(_NON_DIGIT.sub("", value)) > _MAX_PAN_DIGITS:
+                    scanned.add(name)
+                else:
+                    numeric.setdefault(name, []).append(value)
+        for name, values in numeric.items():
+            if name not in scanned and (len(values) < _MIN_LUHN_VALUES or
+                                        sum(luhn_check_batch(values)) >= MIN_LUHN_PASS_RATE * len(values)):
+                scanned.add(name)
+        self.skipped = seen - scanned
+
+    def wanted(self, name: str) -> bool:
+        if self.fields is not None:
+            return name in self.fields
+        return name not in self.skipped
+
+
+class _RecordCursor:
+    """
+    Record index and field of ascending positions in a joined batch
+    Records are joined with _RECORD_SEPARATOR and their fields with
+    _FIELD_SEPARATOR; separators are counted only between consecutive
+    positions, so attributing every hit costs one pass over the batch.
+    """
+    __slots__ = ("text", "record", "position")
+
+    def __init__(self, text: str, first_record: int):
+        self.text = text
+        self.record = first_record
+        self.position = 0
+
+    def locate(self, position: int) -> Tuple[int, int, int]:
+        """(record index, field number in the record, 1-based column in the field)"""
+        text = self.text
+        self.record += text.count(_RECORD_SEPARATOR, self.position, position)
+        self.position = position
+        record_start = text.rfind(_RECORD_SEPARATOR, 0, position) + 1
+        field = text.count(_FIELD_SEPARATOR, record_start, position)
+        field_start = max(record_start, text.rfind(_FIELD_SEPARATOR, record_start, position) + 1)
+        return self.record, field, position - field_start + 1
+
+
+def iter_record_violations(monitor, stream: IO, record_format: Optional[str] = None,
+                           fields: Optional[Iterable[str]] = None, source: str = "records",
+                           stats: Optional[dict] = None) -> Iterator[PanViolation]:
+    """
+    Scan CSV or NDJSON records, yielding violations with `record` and `field`
+    Records are read RECORD_BATCH at a time and scanned as one joined text
+    with the single-pass scanner; the record and field of a hit are only
+    worked out for Luhn-valid hits. Binary streams may be gzip, bz2 or xz
+    compressed. `record` is the 0-based data record (CSV header and blank
+    NDJSON lines excluded), `column` the 1-based position in the field.
+    """
+    started = time.perf_counter()
+    if not isinstance(stream, io.TextIOBase):
+        stream, compression, _ = open_log_stream(stream)
+        stream = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+        if stats is not None and compression:
+            stats["compression"] = compression
+
+    first_line = stream.readline()
+    if record_format is None:
+        record_format = detect_format(first_line)
+    lines = chain([first_line], stream)
+    if record_format == "csv":
+        scan = _scan_csv
+    elif record_format == "ndjson":
+        scan = _scan_ndjson
+    else:
+        raise ValueError(f"Unknown record format: {record_format}")
+
+    if stats is not None:
+        stats.setdefault("records_total", 0)
+    yield from scan(monitor, lines, FieldSelector(fields), source, stats)
+
+    if stats is not None:
+        record_throughput(stats, time.perf_counter() - started)
+        if stats["seconds"] > 0:
+            stats["records_per_s"] = round(stats["records_total"] / stats["seconds"])
+
+
+def _scan_csv(monitor, lines: Iterable[str], selector: FieldSelector, source: str,
+              stats: Optional[dict]) -> Iterator[PanViolation]:
+    """
+    Scan the selected CSV columns
+    Rows are parsed by the csv module and the wanted columns of a batch
+    joined with itemgetter and str.join, so no Python code runs per field.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    sample = list(islice(reader, SAMPLE_RECORDS))
+    selector.learn([list(zip(header, row)) for row in sample])
+    columns = [i for i, name in enumerate(header) if selector.wanted(name)]
+    if stats is not None:
+        stats["fields_skipped"] = [name for name in header if not selector.wanted(name)]
+        stats.setdefault("fields_scanned", 0)
+
+    getter = itemgetter(*columns) if columns else None
+    join_row = getter if len(columns) == 1 else lambda row: _FIELD_SEPARATOR.join(getter(row))
+    index = 0
+    rows = chain(sample, reader)
+    while True:
+        batch = list(islice(rows, RECORD_BATCH))
+        if not batch:
+            return
+        if stats is not None:
+            stats["records_total"] += len(batch)
+            stats["fields_scanned"] += len(batch) * len(columns)
+        if columns:
+            try:
+                text = _RECORD_SEPARATOR.join(map(join_row, batch))
+            except IndexError:
+                # Ragged rows - pad the short ones to the header width
+                width = len(header)
+                batch = [row + [""] * (width - len(row)) for row in batch]
+                text = _RECORD_SEPARATOR.join(map(join_row, batch))
+            cursor = _RecordCursor(text, index)
+            detected_at = utc_timestamp()
+            for match, candidate in _valid_hits(monitor, text, stats):
+                violation = monitor._build_violation(candidate, source, detected_at)
+                if violation is None:
+                    continue
+                violation.record, field, violation.column = cursor.locate(match.start())
+                violation.field = header[columns[field]]
+                yield violation
+        index += len(batch)
+
+
+def _scan_ndjson(monitor, lines: Iterable[str], selector: FieldSelector, source: str,
+                 stats: Optional[dict]) -> Iterator[PanViolation]:
+    """
+    Scan NDJSON records
+    A batch of raw lines is scanned as is, which is far cheaper than
+    decoding every record; a hit's line is then decoded to name the field
+    holding it, and hits in skipped fields (numbers, unselected fields)
+    are dropped.
+    """
+    lines = filter(str.strip, lines)
+    sample = list(islice(lines, SAMPLE_RECORDS))
+    selector.learn([list(flatten(record)) for record in map(_decode, sample)])
+    if stats is not None:
+        stats["fields_skipped"] = sorted(selector.skipped)
+
+    index = 0
+    records = chain(sample, lines)
+    while True:
+        batch = list(islice(records, RECORD_BATCH))
+        if not batch:
+            return
+        if stats is not None:
+            stats["records_total"] += len(batch)
+        text = _RECORD_SEPARATOR.join(batch)
+        cursor = _RecordCursor(text, index)
+        detected_at = utc_timestamp()
+        decoded_record, fields = None, []
+        for match, candidate in _valid_hits(monitor, text, stats):
+            record = cursor.locate(match.start())[0]
+            if record != decoded_record:
+                decoded_record, fields = record, list(flatten(_decode(batch[record - index])))
+                claimed = {}  # field -> where its next hit can start
+            # Hits come in text order, so the same number twice in a record
+            # is matched to successive occurrences
+            for name, value in fields:
+                column = value.find(candidate, claimed.get(name, 0))
+                if column >= 0:
+                    claimed[name] = column + len(candidate)
+                    break
+            else:
+                continue  # only in a key or escaped - not a field value
+            if not selector.wanted(name):
+                continue
+            violation = monitor._build_violation(candidate, source, detected_at)
+            if violation is None:
+                continue
+            violation.record, violation.field, violation.column = record, name, column + 1
+            yield violation
+        index += len(batch)
+
+
+def _decode(line: str) -> dict:
+    """JSON object on a line, or {} for malformed lines and non-objects"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return {}
+    return record if isinstance(record, dict) else {}
+
+
+def _valid_hits(monitor, text: str, stats: Optional[dict]) -> Iterator[Tuple[re.Match, str]]:
+    """(match, candidate) for each Luhn-valid PAN in a joined batch"""
+    matches = list(monitor.scanner.iter_matches(text, stats=stats))
+    candidates = [match.group() for match in matches]
+    for match, candidate, valid in zip(matches, candidates, monitor.luhn_check_batch(candidates)):
+        if valid:
+            yield match, candidate
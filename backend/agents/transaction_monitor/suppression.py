@@ -0,0 +1,87 @@
+"""
+Agent 3: Transaction Monitor - false-positive suppression
+Keyed-hash allowlist of test PANs and per-entity exceptions from analyst verdicts
+"""
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .dedup import default_key, pan_fingerprint
+
+# Published card-network test numbers - QA and sandbox logs are full of them
+KNOWN_TEST_PANS = (
+    # Visa
+    "4111111111111111", "4242424242424242", "4012888888881881", "4000056655665556",
+    "4222222222222", "4005519200000004", "4009348888881881", "4012000033330026",
+    # Mastercard
+    "5555555555554444", "5105105105105100", "5200828282828210", "5425233430109903",
+    "2223003122003222", "2221000000000009",
+    # American Express
+    "378282246310005", "371449635398431", "378734493671000",
+    # Discover
+    "6011111111111117", "6011000990139424", "6011000400000000",
+    # Diners Club and JCB
+    "30569309025904", "38520000023237", "3530111333300000", "3566002020360505",
+)
+
+
+class SuppressionList:
+    """
+    Candidates that are not real violations, held only as keyed hashes
+    Known test PANs are suppressed everywhere; a PAN an analyst marked as
+    a false positive is suppressed for that entity only. Both checks are
+    one set lookup on the violation's fingerprint. Fingerprints use the
+    FindingDeduplicator key, so exceptions learned from alert fingerprints
+    match later scans; TransactionMonitor refuses a dedup store and a
+    suppression list whose keys differ.
+    """
+
+    def __init__(self, test_pans: Iterable[str] = KNOWN_TEST_PANS, key: Optional[bytes] = None):
+        self._key = key if key is not None else default_key()
+        self.test_cards: Set[str] = {self.fingerprint(pan) for pan in test_pans}
+        # (entity_id, fingerprint) pairs marked false positive
+        self.exceptions: Set[Tuple[str, str]] = set()
+        self.counts = {"test_cards": 0, "false_positives": 0}
+        self.by_entity: Dict[str, int] = {}
+
+    def fingerprint(self, digits: str) -> str:
+        return pan_fingerprint(self._key, digits)
+
+    def allow(self, digits: str) -> None:
+        """Add a test PAN to the allowlist"""
+        self.test_cards.add(self.fingerprint(digits))
+
+    def is_test_card(self, fingerprint: str) -> bool:
+        """Whether the fingerprint is a known test PAN - counted when it is"""
+        if fingerprint in self.test_cards:
+            self.counts["test_cards"] += 1
+            return True
+        return False
+
+    def is_exception(self, entity_id: str, fingerprint: str) -> bool:
+        """Whether the PAN was marked a false positive for this entity - counted when it was"""
+        if (entity_id, fingerprint) in self.exceptions:
+            self.counts["false_positives"] += 1
+            self.by_entity[entity_id] = self.by_entity.get(entity_id, 0) + 1
+            return True
+        return False
+
+    def counted_since(self, before: Dict[str, int]) -> Dict[str, int]:
+        """Suppressions counted since a dict(counts) snapshot"""
+        return {reason: count - before.get(reason, 0) for reason, count in self.counts.items()}
+
+    def learn(self, entity_id: str, fingerprints: Iterable[str]) -> int:
+        """Record a false-positive verdict; returns how many new exceptions it added"""
+        before = len(self.exceptions)
+        self.exceptions.update((entity_id, fingerprint) for fingerprint in fingerprints)
+        return len(self.exceptions) - before
+
+    def forget(self, entity_id: str, fingerprints: Iterable[str]) -> None:
+        """Withdraw exceptions, e.g. when a false-positive verdict is reversed"""
+        self.exceptions.difference_update((entity_id, fingerprint) for fingerprint in fingerprints)
+
+    def stats(self) -> dict:
+        return {
+            "test_cards": len(self.test_cards),
+            "exceptions": len(self.exceptions),
+            "suppressed": dict(self.counts),
+            "suppressed_by_entity": dict(self.by_entity),
+        }
@@ -0,0 +1,142 @@
+"""
+Agent 3: Transaction Monitor - separator-agnostic PAN tokenizer
+Finds card-number digit sequences however they are grouped or separated
+"""
+import re
+import time
+from typing import Iterator, Optional, Tuple
+
+from .scanner import CHUNK_SIZE, Scannable, _profile
+
+# Characters allowed between the digit groups of a PAN
+TOKEN_SEPARATORS = b" \t-."
+
+# Most separator characters between two digit groups ("4532  0151")
+MAX_GAP = 2
+
+# Digit count of a PAN
+MIN_DIGITS = 13
+MAX_DIGITS = 19
+
+# Profile: digits -> '9', allowed separators -> '-', everything else -> '.'
+_TOKEN_PROFILE_TABLE = bytes(
+    ord("9") if 48 <= c <= 57 else ord("-") if c in TOKEN_SEPARATORS else ord(".")
+    for c in range(256)
+)
+
+# Deletes every separator, leaving the digits of a token
+_DELETE_SEPARATORS = str.maketrans("", "", TOKEN_SEPARATORS.decode())
+
+# Digit runs with at least MIN_DIGITS digits, gaps of at most MAX_GAP. Over
+# the profile this is deterministic: it only starts at a run's first digit
+# and every step consumes a digit, so it never backtracks into the text
+_RUN = re.compile(
+    rb"(?<!9)(?<!9-)(?<!9--)9(?:-{0,%d}9){%d,}+" % (MAX_GAP, MIN_DIGITS - 1)
+)
+
+# Profile lookbehind kept before each block
+_BLOCK_CONTEXT = MAX_GAP + 1
+
+# Runs longer than this (characters) are not extended across a block edge
+MAX_RUN_SPAN = 4096
+
+# Sub-block the seed check runs on (profile bytes)
+SEED_BLOCK = 1024
+
+# With separators deleted, every token's first MIN_DIGITS digits are one
+# contiguous run inside this many characters of its start
+_SEED = b"9" * MIN_DIGITS
+_SEED_SPAN = MIN_DIGITS + (MIN_DIGITS - 1) * MAX_GAP
+
+# (digits, start, end) - a PAN-length digit string and its span in the text
+Token = Tuple[str, int, int]
+
+
+class PanTokenizer:
+    """
+    Linear-time PAN candidate tokenizer
+    Digits are accumulated across any mix of spaces, tabs, dashes and dots
+    (at most MAX_GAP between groups), so 4-4-4-4, 4-6-5 AMEX grouping,
+    dotted and irregularly spaced numbers all come out as one candidate
+    with its original span. The text is profiled with one translate call
+    per block; each SEED_BLOCK of profile has its separators deleted and is
+    searched for MIN_DIGITS digits in a row, and only sub-blocks that hold
+    one are walked for digit runs.
+    """
+
+    def iter_tokens(self, text: Scannable, pos: int = 0,
+                    endpos: Optional[int] = None) -> Iterator[Token]:
+        """Yield (digits, start, end) for every PAN-length digit run, in order"""
+        if endpos is None:
+            endpos = len(text)
+
+        for block_start in range(pos, endpos, CHUNK_SIZE):
+            block_end = min(block_start + CHUNK_SIZE, endpos)
+            # A little context before the block so runs never start mid-way
+            profile_start = max(block_start - _BLOCK_CONTEXT, pos)
+            profile = _profile(text, profile_start, min(block_end + MAX_RUN_SPAN, endpos),
+                               _TOKEN_PROFILE_TABLE)
+            limit = block_end - profile_start
+            resume = 0
+
+            for sub_start in range(block_start - profile_start, limit, SEED_BLOCK):
+                sub_end = min(sub_start + SEED_BLOCK, limit)
+                # Runs starting in this sub-block hold their first MIN_DIGITS
+                # digits before sub_end + _SEED_SPAN
+                search_end = sub_end + _SEED_SPAN
+                position = max(sub_start, resume)
+                while position < sub_end:
+                    # No token starts before the next seed: deleting
+                    # separators only moves the text left
+                    seed = profile[position:search_end].translate(None, b"-").find(_SEED)
+                    if seed < 0:
+                        break
+                    head = _RUN.search(profile, position + seed, search_end)
+                    if head is None or head.start() >= sub_end:
+                        break
+                    run = _RUN.match(profile, head.start())
+                    yield from self._split_run(text, profile, run.start(), run.end(), profile_start)
+                    position = resume = run.end()
+
+    def _split_run(self, text: Scannable, profile: bytes, start: int, end: int,
+                   offset: int) -> Iterator[Token]:
+        """Emit a run whole when it has a PAN's digit count, else its PAN-sized group windows"""
+        digits = _digits(text, offset + start, offset + end)
+        if len(digits) <= MAX_DIGITS:
+            yield digits, offset + start, offset + end
+            return
+
+        # Longer runs: take consecutive whole groups, left to right, as
+        # long a window as fits in MAX_DIGITS
+        groups = []  # (start, end, digit count) of each digit group
+        index = start
+        while index < end:
+            group_end = profile.find(b"-", index, end)
+            if group_end < 0:
+                group_end = end
+            groups.append((index, group_end, group_end - index))
+            index = group_end
+            while index < end and profile[index] == 45:  # skip '-'
+                index += 1
+
+        first = 0
+        while first < len(groups):
+            count = 0
+            last = first
+            while last < len(groups) and count + groups[last][2] <= MAX_DIGITS:
+                count += groups[last][2]
+                last += 1
+            if count >= MIN_DIGITS:
+                window_start, window_end = groups[first][0], groups[last - 1][1]
+                yield _digits(text, offset + window_start, offset + window_end), \
+                    offset + window_start, offset + window_end
+                first = last
+            else:
+                first += 1
+
+
+def _digits(text: Scannable, start: int, end: int) -> str:
+    chunk = text[start:end]
+    if not isinstance(chunk, str):
+        chunk = bytes(chunk).decode("ascii")
+    return chunk.translate(_DELETE_SEPARATORS)
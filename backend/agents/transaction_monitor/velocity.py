@@ -0,0 +1,151 @@
+"""
+Agent 3: Transaction Monitor - cross-merchant card velocity
+Sliding-window attempt and merchant counts per hashed card, in time buckets
+"""
+import hashlib
+import secrets
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .records import iso_timestamp
+
+# Window the limits apply to, and the bucket size it slides by (seconds)
+VELOCITY_WINDOW = 600
+BUCKET_SECONDS = 60
+
+# A card is flagged at this many distinct merchants or attempts per window
+MAX_MERCHANTS_PER_CARD = 5
+MAX_ATTEMPTS_PER_CARD = 20
+
+
+class _Bucket:
+    """Everything seen in one time slice: card hash -> [attempts, merchants]"""
+    __slots__ = ("index", "cards", "flagged")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.cards: Dict[bytes, list] = {}
+        # Cards flagged while this bucket was current
+        self.flagged = set()
+
+
+class CardVelocityEngine:
+    """
+    Cross-merchant velocity per card over a sliding window
+    Cards are keyed by a keyed BLAKE2b hash, never the PAN. Each bucket
+    holds its own per-card tallies; a card's window totals are summed
+    over the live buckets (window / bucket of them) on each attempt, and
+    expiry drops whole buckets - nothing is expired entry by entry. The
+    window therefore slides in bucket steps. A card is flagged once per
+    window when it reaches max_merchants distinct merchants or
+    max_attempts attempts.
+    """
+
+    def __init__(self, window: float = VELOCITY_WINDOW, bucket_seconds: float = BUCKET_SECONDS,
+                 max_merchants: int = MAX_MERCHANTS_PER_CARD, max_attempts: int = MAX_ATTEMPTS_PER_CARD,
+                 key: Optional[bytes] = None):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(int(window // bucket_seconds), 1)
+        self.max_merchants = max_merchants
+        self.max_attempts = max_attempts
+        self._key = key if key is not None else secrets.token_bytes(32)
+        # Whether a card's first attempt in a window can be passed without adding up its totals
+        self._single_below_limits = max_merchants > 1 and max_attempts > 1
+        self.buckets: deque = deque()
+        self.events = 0
+        self.late_events = 0
+
+    def card_hash(self, card: str) -> bytes:
+        """Keyed 8-byte hash of a card number or token"""
+        return hashlib.blake2b(card.encode(), key=self._key, digest_size=8).digest()
+
+    def observe(self, card: str, merchant_id: str, timestamp: Optional[float] = None) -> Optional[dict]:
+        """Count one attempt; returns an alert dict the first time the card crosses a limit this window"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.events += 1
+        bucket = self._bucket(int(timestamp // self.bucket_seconds))
+        if bucket is None:
+            self.late_events += 1
+            return None
+
+        key = self.card_hash(card)
+        entry = bucket.cards.get(key)
+        if entry is None:
+            bucket.cards[key] = [1, {merchant_id}]
+            if self._single_below_limits and (len(self.buckets) == 1 or not self._seen_earlier(key, bucket)):
+                return None  # first attempt in the window, and one attempt trips no limit
+        else:
+            entry[0] += 1
+            entry[1].add(merchant_id)
+
+        attempts = 0
+        merchants = set()
+        for live in self.buckets:
+            other = live.cards.get(key)
+            if other is not None:
+                attempts += other[0]
+                merchants |= other[1]
+        if len(merchants) < self.max_merchants and attempts < self.max_attempts:
+            return None
+        if any(key in live.flagged for live in self.buckets):
+            return None
+        bucket.flagged.add(key)
+        return self._alert(key, merchant_id, attempts, merchants, timestamp)
+
+    def observe_many(self, events: Iterable[Tuple[str, str, float]]) -> List[dict]:
+        """Count (card, merchant_id, timestamp) attempts; returns the alerts raised"""
+        alerts = []
+        observe = self.observe
+        for card, merchant_id, timestamp in events:
+            alert = observe(card, merchant_id, timestamp)
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def _seen_earlier(self, key: bytes, current: _Bucket) -> bool:
+        return any(key in live.cards for live in self.buckets if live is not current)
+
+    def _bucket(self, index: int) -> Optional[_Bucket]:
+        """Bucket for a time slice - new slices expire the oldest buckets wholesale"""
+        buckets = self.buckets
+        if not buckets or index > buckets[-1].index:
+            buckets.append(_Bucket(index))
+            oldest = index - self.bucket_count
+            while buckets[0].index <= oldest:
+                buckets.popleft()
+            return buckets[-1]
+        if index <= buckets[-1].index - self.bucket_count:
+            return None  # older than the window
+        for position in range(len(buckets) - 1, -1, -1):
+            if buckets[position].index == index:
+                return buckets[position]
+            if buckets[position].index < index:
+                buckets.insert(position + 1, _Bucket(index))
+                return buckets[position + 1]
+        buckets.appendleft(_Bucket(index))
+        return buckets[0]
+
+    def _alert(self, key: bytes, merchant_id: str, attempts: int, merchants: set, timestamp: float) -> dict:
+        """Alert raised at the merchant where the card crossed a limit"""
+        return {
+            "type": "card_velocity",
+            "severity": "critical" if len(merchants) >= self.max_merchants else "high",
+            "entity_id": merchant_id,
+            "card_hash": key.hex(),
+            "attempts": attempts,
+            "merchant_count": len(merchants),
+            "merchants": sorted(merchants),
+            "window_seconds": self.bucket_count * self.bucket_seconds,
+            "detected_at": iso_timestamp(timestamp),
+            "description": f"Card used {attempts} times at {len(merchants)} merchants within "
+                           f"{self.bucket_count * self.bucket_seconds // 60:.0f} minutes",
+        }
+
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "late_events": self.late_events,
+            "live_buckets": len(self.buckets),
+            "cards_in_window": sum(len(bucket.cards) for bucket in self.buckets),
+        }
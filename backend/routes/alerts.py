@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional
 
 from mock_data import alerts, alert_details
+from routes.demo import monitor
 
 router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
 
@@ -32,7 +33,11 @@ async def get_alert_detail(alert_id: str):
 
 @router.patch("/{alert_id}")
 async def update_alert_status(alert_id: str, status: str):
-    """Update alert status (open → investigating → resolved)"""
+    """
+    Update alert status (open → investigating → resolved)
+    A false_positive verdict exempts the alert's PANs for its entity in
+    later scans; moving away from false_positive withdraws that.
+    """
     valid_statuses = ["open", "investigating", "resolved", "false_positive"]
     
     if status not in valid_statuses:
@@ -44,6 +49,15 @@ async def update_alert_status(alert_id: str, status: str):
     if alert_id not in alert_details:
         raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
     
+    # Teach Agent 3's suppression list the verdict
+    detail = alert_details[alert_id]
+    fingerprints = detail.get("fingerprints", [])
+    if fingerprints and monitor.suppressions is not None:
+        if status == "false_positive":
+            monitor.suppressions.learn(detail["entity_id"], fingerprints)
+        elif detail["status"] == "false_positive":
+            monitor.suppressions.forget(detail["entity_id"], fingerprints)
+    
     # Update in mock data
     alert_details[alert_id]["status"] = status
     
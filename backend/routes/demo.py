@@ -1,14 +1,34 @@
 """Demo API routes for hackathon showcase"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Body
 from datetime import datetime
+from typing import List, Optional
+import random
+import time
 import uuid
 
-from agents.transaction_monitor import TransactionMonitor
+from agents.transaction_monitor import FindingDeduplicator, SuppressionList, TransactionMonitor
 from mock_data import alerts, alert_details
 
 router = APIRouter(prefix="/api/demo", tags=["Demo"])
 
-monitor = TransactionMonitor()
+# Repeat sightings of an already-alerted PAN update that alert; test PANs
+# and PANs marked false positive for the entity raise nothing
+monitor = TransactionMonitor(dedup=FindingDeduplicator(), suppressions=SuppressionList())
+
+# Entity the demo scans are attributed to
+DEMO_ENTITY = "MID-DEMO"
+
+
+def _record_repeats(alert_id: str, sightings: int, seen_at: str):
+    """Bump the repeat count and last-seen time of an existing alert"""
+    detail = alert_details[alert_id]
+    detail["repeat_sightings"] = detail.get("repeat_sightings", 0) + sightings
+    detail["last_seen"] = seen_at
+    for alert in alerts:
+        if alert["id"] == alert_id:
+            alert["repeat_sightings"] = detail["repeat_sightings"]
+            alert["last_seen"] = seen_at
+            break
 
 
 @router.post("/scan")
@@ -16,7 +36,8 @@ async def demo_transaction_scan(log_content: str = None):
     """
     Demo endpoint to show Agent 3 in action.
     Scans provided log content (or uses demo data) for PAN violations.
-    Creates a new alert if violations found.
+    Creates a new alert for PANs not alerted before; repeat sightings
+    update the existing alert's count and last-seen time instead.
     """
     # Use demo log if none provided
     if not log_content:
@@ -27,10 +48,23 @@ async def demo_transaction_scan(log_content: str = None):
         """
     
     # Run the scan
-    result = monitor.scan_transaction_log(log_content)
+    result, findings = monitor.scan_transaction_log_findings(log_content, entity_id=DEMO_ENTITY)
+    
+    # Split into PANs with no alert yet (each once, however often it appears)
+    # and repeats of alerted ones
+    new_by_fingerprint = {}
+    repeats = {}
+    for violation, finding in zip(result["violations"], findings):
+        if finding.alert_id in alert_details:
+            repeats[finding.alert_id] = repeats.get(finding.alert_id, 0) + 1
+        else:
+            new_by_fingerprint.setdefault(violation["fingerprint"], (violation, finding))
+    new_violations = list(new_by_fingerprint.values())
+    for alert_id, sightings in repeats.items():
+        _record_repeats(alert_id, sightings, result["scanned_at"])
     
-    # If violations found, create a new alert
-    if result["violations"]:
+    # If new violations found, create a new alert
+    if new_violations:
         new_alert_id = f"ALT-{str(uuid.uuid4())[:4].upper()}"
         
         new_alert = {
@@ -39,7 +73,7 @@ async def demo_transaction_scan(log_content: str = None):
             "title": f"[DEMO] PAN Detected by Agent 3",
             "description": f"Full card number found in transaction log - detected by live scan",
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "entity_id": "MID-DEMO",
+            "entity_id": DEMO_ENTITY,
             "regulation": "PCI-DSS 3.4",
             "status": "open",
         }
@@ -50,12 +84,12 @@ async def demo_transaction_scan(log_content: str = None):
 
 Agent: Transaction Monitor (Agent 3)
 Scan Time: {result['scanned_at']}
-Violations Found: {result['violations_found']}
+Violations Found: {len(new_violations)}
 
 Details:
 """ + "\n".join([
                 f"- {v['card_type']} card: {v['matched_pattern']}"
-                for v in result['violations']
+                for v, _ in new_violations
             ]),
             "recommendations": [
                 "Immediately investigate source of plaintext PAN",
@@ -68,44 +102,138 @@ Details:
                 "entity_name": "Demo Merchant",
                 "entity_volume": "Demo scan",
             },
+            # Keyed PAN hashes - a false_positive verdict exempts them for the entity
+            "fingerprints": [v["fingerprint"] for v, _ in new_violations],
         }
         
         # Add to mock data
         alerts.insert(0, new_alert)
         alert_details[new_alert_id] = new_alert_detail
+        for _, finding in new_violations:
+            finding.alert_id = new_alert_id
         
         return {
             "data": {
                 "scan_result": result,
                 "alert_created": new_alert,
+                "alerts_updated": list(repeats),
                 "message": f"⚠️ Violation detected! Alert {new_alert_id} created.",
             }
         }
     
+    if repeats:
+        return {
+            "data": {
+                "scan_result": result,
+                "alert_created": None,
+                "alerts_updated": list(repeats),
+                "message": f"🔁 Known PAN seen again - updated {', '.join(repeats)}.",
+            }
+        }
+    
     return {
         "data": {
             "scan_result": result,
             "alert_created": None,
+            "alerts_updated": [],
             "message": "✅ No violations detected.",
         }
     }
 
 
+# Alert titles per streaming detector
+STREAM_ALERT_TITLES = {
+    "volume_spike": "Transaction volume spike",
+    "card_testing": "Card testing pattern detected",
+    "card_velocity": "Card used across many merchants",
+    "distribution_shift": "Transaction mix shifted from baseline",
+}
+
+
+def _demo_events() -> List[dict]:
+    """Four normal hours at MID-4521 (95% US, 6% declines), then an hour like ALT-001"""
+    rng = random.Random(4521)
+    start = time.time() - 5 * 3600
+    events = []
+    for i in range(400):
+        events.append({"merchant_id": "MID-4521", "card": f"4{rng.randrange(10 ** 15):015d}",
+                       "country": "US" if rng.random() < 0.95 else "CA",
+                       "response_code": "05" if rng.random() < 0.06 else "00",
+                       "timestamp": start + i * 36})
+    for i in range(200):
+        events.append({"merchant_id": "MID-4521", "card": f"4{rng.randrange(10 ** 15):015d}",
+                       "country": rng.choice(["RU", "UA", "BY"]) if rng.random() < 0.78 else "US",
+                       "response_code": "05" if rng.random() < 0.34 else "00",
+                       "timestamp": start + 4 * 3600 + i * 18})
+    return events
+
+
+def _create_stream_alert(report: dict) -> dict:
+    """Turn a streaming detector's alert dict into an alert with details"""
+    alert_id = f"ALT-{str(uuid.uuid4())[:4].upper()}"
+    alert = {
+        "id": alert_id,
+        "severity": report["severity"],
+        "title": f"[DEMO] {STREAM_ALERT_TITLES.get(report['type'], 'Transaction anomaly')}",
+        "description": report["description"],
+        "timestamp": report["detected_at"],
+        "entity_id": report["entity_id"],
+        "regulation": "PCI-DSS",
+        "status": "open",
+    }
+    alerts.insert(0, alert)
+    alert_details[alert_id] = {
+        **alert,
+        "evidence": "Streaming Detection Result:\n\nAgent: Transaction Monitor (Agent 3)\n\n" + "\n".join(
+            f"- {key}: {value}" for key, value in report.items()
+            if key not in ("severity", "description", "detected_at")),
+        "recommendations": [
+            "Review the merchant's recent authorizations",
+            "Confirm with the acquirer whether the shift is expected",
+        ],
+        "context": {"similar_violations": len(alerts), "entity_volume": "Streaming events"},
+    }
+    return alert
+
+
+@router.post("/ingest")
+async def demo_ingest_events(events: Optional[List[dict]] = Body(default=None)):
+    """
+    Demo endpoint feeding authorization events to Agent 3's streaming
+    detectors (volume, card testing, velocity, country / decline drift).
+    Each alert raised becomes an alert, and flags its entity for the
+    risk score's anomaly factor.
+    """
+    if not events:
+        events = _demo_events()
+    raised = monitor.ingest_events(events)
+    created = [_create_stream_alert(report) for report in raised]
+    return {
+        "data": {
+            "events": len(events),
+            "detections": raised,
+            "alerts_created": created,
+            "message": f"⚠️ {len(created)} anomaly alert(s) created." if created else "✅ No anomalies detected.",
+        }
+    }
+
+
 @router.post("/validate-card")
 async def validate_card_number(card_number: str):
     """
     Demo endpoint to validate a card number.
     Shows Luhn algorithm and card type detection.
     """
-    is_valid = monitor.luhn_check(card_number)
-    card_type = monitor.detect_card_type(card_number) if is_valid else None
+    is_valid = monitor.luhn_check_batch([card_number])[0]
+    issuer = monitor.lookup_issuer(card_number) if is_valid else None
     masked = monitor.mask_pan(card_number)
     
     return {
         "data": {
             "masked_number": masked,
             "is_valid_luhn": is_valid,
-            "card_type": card_type,
+            "card_type": issuer["card_type"] if issuer else None,
+            "issuer_country": issuer["issuer_country"] if issuer else None,
             "would_trigger_alert": is_valid,
         }
     }
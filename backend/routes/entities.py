@@ -5,17 +5,18 @@ from pydantic import BaseModel
 
 from mock_data import entities, alerts
 from agents.ecosystem_tracker import EcosystemTracker
+from routes.demo import monitor
 
 router = APIRouter(prefix="/api/entities", tags=["Entities"])
 
-# Initialize Agent 2
-ecosystem_tracker = EcosystemTracker()
+# Initialize Agent 2 - the anomaly factor comes from Agent 3's streaming detectors
+ecosystem_tracker = EcosystemTracker(anomaly_source=monitor.has_anomalies)
 
 
 # Request models
 class RiskCalculationRequest(BaseModel):
     violation_count: int = 0
-    has_anomalies: bool = False
+    has_anomalies: Optional[bool] = None
 
 
 class StatusUpdateRequest(BaseModel):
@@ -104,11 +105,12 @@ async def get_entity_certifications(entity_id: str):
 async def get_entity_risk(
     entity_id: str,
     violation_count: int = Query(default=0, ge=0),
-    has_anomalies: bool = Query(default=False)
+    has_anomalies: Optional[bool] = Query(default=None)
 ):
     """
     Calculate comprehensive risk score for an entity
     Agent 2: Ecosystem Tracker functionality
+    has_anomalies defaults to whether Agent 3 has flagged the entity
     """
     # Get entity to verify it exists
     entity = next((e for e in entities if e["id"] == entity_id), None)